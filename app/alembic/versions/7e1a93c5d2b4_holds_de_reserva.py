@@ -0,0 +1,46 @@
+"""Holds de reserva com expiracao
+
+Revision ID: 7e1a93c5d2b4
+Revises: 0c6d2f94b871
+Create Date: 2026-10-18 15:51:27.904316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1a93c5d2b4'
+down_revision: Union[str, Sequence[str], None] = '0c6d2f94b871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('booking_holds',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('hotel_id', sa.Integer(), nullable=False),
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('check_in', sa.Date(), nullable=False),
+    sa.Column('check_out', sa.Date(), nullable=False),
+    sa.Column('rooms_booked', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.ForeignKeyConstraint(['hotel_id'], ['hotels.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_booking_holds_expires_at'), 'booking_holds', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_booking_holds_user_id'), 'booking_holds', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_booking_holds_user_id'), table_name='booking_holds')
+    op.drop_index(op.f('ix_booking_holds_expires_at'), table_name='booking_holds')
+    op.drop_table('booking_holds')
@@ -0,0 +1,60 @@
+"""Contadores incrementais de metricas de hoteis
+
+Revision ID: a4c7e0b19d52
+Revises: e91b4d27c6f0
+Create Date: 2026-10-18 13:41:52.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e0b19d52'
+down_revision: Union[str, Sequence[str], None] = 'e91b4d27c6f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hotels', sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('hotels', sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table('hotel_booking_days',
+    sa.Column('hotel_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['hotel_id'], ['hotels.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('hotel_id', 'day')
+    )
+
+    # Popula os contadores a partir do histórico existente
+    op.execute(
+        """
+        UPDATE hotels h
+        SET rating_sum = r.rating_sum, review_count = r.review_count
+        FROM (
+            SELECT hotel_id, SUM(rating) AS rating_sum, COUNT(*) AS review_count
+            FROM reviews
+            GROUP BY hotel_id
+        ) r
+        WHERE r.hotel_id = h.id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO hotel_booking_days (hotel_id, day, bookings)
+        SELECT hotel_id, created_at::date, COUNT(*)
+        FROM bookings
+        GROUP BY hotel_id, created_at::date
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('hotel_booking_days')
+    op.drop_column('hotels', 'review_count')
+    op.drop_column('hotels', 'rating_sum')
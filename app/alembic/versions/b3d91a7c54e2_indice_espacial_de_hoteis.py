@@ -0,0 +1,34 @@
+"""Indice espacial de hoteis (earthdistance)
+
+Revision ID: b3d91a7c54e2
+Revises: f279fb813d23
+Create Date: 2026-10-18 09:12:41.203118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d91a7c54e2'
+down_revision: Union[str, Sequence[str], None] = 'f279fb813d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # earthdistance depende de cube; o índice GiST atende ordenação KNN (<->) e filtro por raio (earth_box)
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_hotels_earth_location "
+        "ON hotels USING gist (ll_to_earth(latitude, longitude))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_hotels_earth_location")
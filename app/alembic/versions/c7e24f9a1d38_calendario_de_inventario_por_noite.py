@@ -0,0 +1,47 @@
+"""Calendario de inventario por noite (room_nights)
+
+Revision ID: c7e24f9a1d38
+Revises: b3d91a7c54e2
+Create Date: 2026-10-18 10:03:17.554920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e24f9a1d38'
+down_revision: Union[str, Sequence[str], None] = 'b3d91a7c54e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('room_nights',
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('night', sa.Date(), nullable=False),
+    sa.Column('units_booked', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('room_id', 'night')
+    )
+    op.create_index(op.f('ix_room_nights_night'), 'room_nights', ['night'], unique=False)
+
+    # Popula o calendário a partir das reservas existentes (uma linha por quarto/noite)
+    op.execute(
+        """
+        INSERT INTO room_nights (room_id, night, units_booked)
+        SELECT b.room_id, gs.night::date, SUM(b.rooms_booked)
+        FROM bookings b
+        CROSS JOIN LATERAL generate_series(b.check_in, b.check_out - 1, interval '1 day') AS gs(night)
+        GROUP BY b.room_id, gs.night::date
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_room_nights_night'), table_name='room_nights')
+    op.drop_table('room_nights')
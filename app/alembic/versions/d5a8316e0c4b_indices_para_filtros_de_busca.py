@@ -0,0 +1,34 @@
+"""Indices para filtros de busca (amenities, room_type, preco)
+
+Revision ID: d5a8316e0c4b
+Revises: c7e24f9a1d38
+Create Date: 2026-10-18 10:41:52.318407
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8316e0c4b'
+down_revision: Union[str, Sequence[str], None] = 'c7e24f9a1d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_hotel_amenities_amenity_id_hotel_id', 'hotel_amenities', ['amenity_id', 'hotel_id'], unique=False)
+    op.create_index('ix_room_amenities_amenity_id_room_id', 'room_amenities', ['amenity_id', 'room_id'], unique=False)
+    op.create_index('ix_rooms_room_type_hotel_id', 'rooms', ['room_type', 'hotel_id'], unique=False)
+    op.create_index('ix_rooms_hotel_id_base_price', 'rooms', ['hotel_id', 'base_price'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rooms_hotel_id_base_price', table_name='rooms')
+    op.drop_index('ix_rooms_room_type_hotel_id', table_name='rooms')
+    op.drop_index('ix_room_amenities_amenity_id_room_id', table_name='room_amenities')
+    op.drop_index('ix_hotel_amenities_amenity_id_hotel_id', table_name='hotel_amenities')
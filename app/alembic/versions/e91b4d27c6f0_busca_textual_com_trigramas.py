@@ -0,0 +1,48 @@
+"""Busca textual com trigramas (pg_trgm + unaccent)
+
+Revision ID: e91b4d27c6f0
+Revises: d5a8316e0c4b
+Create Date: 2026-10-18 11:26:09.774512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b4d27c6f0'
+down_revision: Union[str, Sequence[str], None] = 'd5a8316e0c4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ("name", "city", "neighborhood")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() é STABLE; o wrapper IMMUTABLE (dicionário fixo) permite usá-lo em índices
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+
+    for column in SEARCH_COLUMNS:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_hotels_{column}_trgm "
+            f"ON hotels USING gin (f_unaccent(lower({column})) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in SEARCH_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_hotels_{column}_trgm")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,28 @@
+"""Indice de historico de reservas por usuario
+
+Revision ID: f3b85d1e7a20
+Revises: a4c7e0b19d52
+Create Date: 2026-10-18 14:22:05.671340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b85d1e7a20'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e0b19d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_user_id_check_in', 'bookings', ['user_id', 'check_in'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_user_id_check_in', table_name='bookings')
@@ -0,0 +1,143 @@
+# logging_config.py
+import contextvars
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.settings import LoggingSettings
+
+# Id da requisição corrente (definido pelo middleware em main.py)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# Atributos padrão do LogRecord; o que sobra veio de extra= e vai para o JSON
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "sampled"}
+
+_SECRET_KEYS = re.compile(r"pass(word)?|token|secret|authorization|cookie", re.IGNORECASE)
+_JWT = re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]+")
+REDACTED = "[REDACTED]"
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Anexa o request_id (contextvar) e descarta eventos de alto volume (extra={"sampled": True})
+    conforme LoggingSettings.SAMPLE_RATE. Roda na thread que loga, antes de enfileirar.
+    """
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False) and random.random() >= self.sample_rate:
+            return False
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada: se o listener não acompanhar, o registro é descartado
+    (e contado) em vez de bloquear a requisição.
+    """
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        # Extras não serializáveis viram texto aqui, enquanto o objeto ainda é válido
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not isinstance(value, (str, int, float, bool, type(None), dict, list)):
+                setattr(record, key, repr(value))
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Uma linha JSON por evento, com segredos mascarados (chaves sensíveis e JWTs no texto).
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": _JWT.sub(REDACTED, record.getMessage()),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                payload[key] = redact(key, value)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def redact(key: str, value):
+    if _SECRET_KEYS.search(key):
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: redact(k, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(key, v) for v in value]
+    if isinstance(value, str):
+        return _JWT.sub(REDACTED, value)
+    return value
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Root logger -> fila em memória -> listener em thread própria -> stdout em JSON.
+    Idempotente; chamado na importação de main.py.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LoggingSettings.QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter(LoggingSettings.SAMPLE_RATE))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LoggingSettings.LEVEL)
+    # Uvicorn configura os próprios handlers; passam a usar a mesma fila
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # O access log fica só com o registro amostrado do middleware (uma linha por requisição seria o dobro)
+    access_logger = logging.getLogger("uvicorn.access")
+    access_logger.handlers = []
+    access_logger.propagate = False
+    access_logger.disabled = True
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Para o listener depois de esvaziar a fila.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    return {"dropped": NonBlockingQueueHandler.dropped}
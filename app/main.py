@@ -9,6 +9,15 @@ import logging
 import time
 from fastapi.middleware.cors import CORSMiddleware
 from app.database.database import engine
+from app.services.search_cache import search_cache
+from app.services.metrics_worker import metrics_worker
+from app.services.hold_sweeper import hold_sweeper
+from app.services.principal_cache import principal_cache
+from app.services.revocation_store import revocation_store
+from app.services.password_hasher import password_hasher
+from app.logging_config import setup_logging, shutdown_logging, logging_stats, request_id_var
+import uuid
+from fastapi import Request
 
 # -------------------- Configurações --------------------
 
@@ -24,9 +33,9 @@ origins = [
     "http://127.0.0.1:8082",
 ]
 
-# Logging estruturado
+# Logging estruturado (JSON via fila, sem bloquear requisições)
+setup_logging()
 logger = logging.getLogger("aluga-api")
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 # -------------------- App --------------------
 app = FastAPI(title="Aluga API")
@@ -41,6 +50,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """
+    Propaga X-Request-ID (ou gera um) para os logs da requisição e registra o access log (amostrado).
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    start_time = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    logger.info(
+        "request",
+        extra={
+            "sampled": True,
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "duration_ms": round((time.perf_counter() - start_time) * 1000, 2),
+        }
+    )
+    return response
+
 # -------------------- Routers --------------------
 app.include_router(hotels.router, tags=["hotels"])
 app.include_router(users.router, tags=["users"])
@@ -58,13 +93,35 @@ def on_startup():
     except Exception as e:
         logger.error(f"Falha ao conectar ao banco: {e}")
 
+    metrics_worker.start()
+    hold_sweeper.start()
+    revocation_store.start()
+
+# -------------------- Eventos de Shutdown --------------------
+@app.on_event("shutdown")
+def on_shutdown():
+    revocation_store.stop()
+    hold_sweeper.stop()
+    # Processa os recálculos de métricas ainda pendentes antes de sair
+    metrics_worker.stop()
+    password_hasher.shutdown()
+    shutdown_logging()
+
 # -------------------- Healthcheck --------------------
 @app.get("/health", tags=["Health"])
 def healthcheck():
     result = {
         "api_status": "ok",
         "db_status": "unknown",
-        "details": {},
+        "details": {
+            "search_cache": search_cache.stats(),
+            "metrics_worker": metrics_worker.stats(),
+            "hold_sweeper": hold_sweeper.stats(),
+            "principal_cache": principal_cache.stats(),
+            "revocation_store": revocation_store.stats(),
+            "password_hasher": password_hasher.stats(),
+            "logging": logging_stats()
+        },
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
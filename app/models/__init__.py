@@ -15,6 +15,11 @@ from .booking import Booking
 from .media import Media
 from .review import Review
 from .user import User
+from .room_night import RoomNight
+from .hotel_booking_day import HotelBookingDay
+from .idempotency_key import IdempotencyKey
+from .booking_hold import BookingHold
+from .revoked_token import RevokedToken
 from .booking import Booking
 
 all_models = [
@@ -25,6 +30,11 @@ all_models = [
     Media,
     Review,
     User,
-    Booking
+    Booking,
+    RoomNight,
+    HotelBookingDay,
+    IdempotencyKey,
+    BookingHold,
+    RevokedToken
 ]
 
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
 
 Base = declarative_base()
 
@@ -13,6 +13,8 @@ hotel_amenities = Table(
     Base.metadata,
     Column("hotel_id", Integer, ForeignKey("hotels.id", ondelete="CASCADE"), primary_key=True),
     Column("amenity_id", Integer, ForeignKey("amenities.id", ondelete="CASCADE"), primary_key=True),
+    # Busca por amenity (filtro de search) parte do amenity_id; a PK começa por hotel_id
+    Index("ix_hotel_amenities_amenity_id_hotel_id", "amenity_id", "hotel_id"),
 )
 
 room_amenities = Table(
@@ -20,5 +22,6 @@ room_amenities = Table(
     Base.metadata,
     Column("room_id", Integer, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True),
     Column("amenity_id", Integer, ForeignKey("amenities.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_room_amenities_amenity_id_room_id", "amenity_id", "room_id"),
 )
 
@@ -1,11 +1,15 @@
 from __future__ import annotations
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Date, Integer, String, DateTime
+from sqlalchemy import ForeignKey, Date, Integer, String, DateTime, Index
 from datetime import date, datetime
 from app.models.base import Base, IntPKMixin
 
 class Booking(IntPKMixin, Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Histórico do usuário: filtro por user_id, intervalo e ordenação por check_in
+        Index("ix_bookings_user_id_check_in", "user_id", "check_in"),
+    )
 
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id", ondelete="CASCADE"), index=True, nullable=False)
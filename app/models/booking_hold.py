@@ -0,0 +1,21 @@
+from __future__ import annotations
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Date, Integer, String, DateTime
+from datetime import date, datetime
+from app.models.base import Base, IntPKMixin
+
+class BookingHold(IntPKMixin, Base):
+    """
+    Bloqueio temporário de inventário durante o checkout. Ocupa as noites em room_nights
+    como uma reserva, até ser confirmado (vira Booking), liberado ou expirar.
+    """
+    __tablename__ = "booking_holds"
+
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id", ondelete="CASCADE"), nullable=False)
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
+    check_in: Mapped[date] = mapped_column(Date, nullable=False)
+    check_out: Mapped[date] = mapped_column(Date, nullable=False)
+    rooms_booked: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, Float
+from sqlalchemy import String, Text, Float, Integer, Index, func
 from app.models.base import Base, IntPKMixin, hotel_amenities
 
 class Hotel(IntPKMixin, Base):
@@ -15,6 +15,9 @@ class Hotel(IntPKMixin, Base):
     longitude: Mapped[float] = mapped_column(Float, nullable=False, index=True)
     stars: Mapped[float] = mapped_column(Float, default=0.0, index=True)
     popularity: Mapped[float] = mapped_column(Float, default=0.0, index=True)
+    # Agregados incrementais de avaliações (stars = rating_sum / review_count)
+    rating_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    review_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     policies: Mapped[str | None] = mapped_column(Text(), nullable=True)
 
     rooms: Mapped[list["Room"]] = relationship(
@@ -51,3 +54,20 @@ class Hotel(IntPKMixin, Base):
         cascade="all, delete-orphan",
         lazy="selectin"
     )
+
+
+# Índice espacial (extensões cube + earthdistance): atende ordenação por distância e filtro por raio
+Index(
+    "ix_hotels_earth_location",
+    func.ll_to_earth(Hotel.latitude, Hotel.longitude),
+    postgresql_using="gist",
+)
+
+# Índices de trigramas (pg_trgm) para busca parcial sem acentos em q, city e neighborhood
+for _column in (Hotel.name, Hotel.city, Hotel.neighborhood):
+    Index(
+        f"ix_hotels_{_column.key}_trgm",
+        func.f_unaccent(func.lower(_column)).label(f"{_column.key}_folded"),
+        postgresql_using="gin",
+        postgresql_ops={f"{_column.key}_folded": "gin_trgm_ops"},
+    )
@@ -0,0 +1,16 @@
+from __future__ import annotations
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Date, Integer
+from datetime import date
+from app.models.base import Base
+
+class HotelBookingDay(Base):
+    """
+    Contador diário de reservas criadas por hotel (data de created_at).
+    Alimenta a janela móvel de popularidade sem varrer a tabela de reservas.
+    """
+    __tablename__ = "hotel_booking_days"
+
+    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    bookings: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
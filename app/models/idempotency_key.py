@@ -0,0 +1,20 @@
+from __future__ import annotations
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from typing import Any
+from app.models.base import Base
+
+class IdempotencyKey(Base):
+    """
+    Resposta gravada por Idempotency-Key (backend "database", compartilhado entre workers).
+    status_code NULL = requisição original ainda em andamento.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(320), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[Any | None] = mapped_column(JSONB, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
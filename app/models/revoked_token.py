@@ -0,0 +1,16 @@
+from __future__ import annotations
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime
+from datetime import datetime
+from app.models.base import Base
+
+class RevokedToken(Base):
+    """
+    jti de tokens revogados (logout). A linha só é necessária até o exp do token;
+    depois disso o próprio JWT já é rejeitado e ela é removida.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -1,10 +1,15 @@
 from __future__ import annotations
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Float, ForeignKey
+from sqlalchemy import String, Integer, Float, ForeignKey, Index
 from app.models.base import Base, IntPKMixin, room_amenities
 
 class Room(IntPKMixin, Base):
     __tablename__ = "rooms"
+    __table_args__ = (
+        # Filtros de search: room_type por hotel e preço mínimo por hotel
+        Index("ix_rooms_room_type_hotel_id", "room_type", "hotel_id"),
+        Index("ix_rooms_hotel_id_base_price", "hotel_id", "base_price"),
+    )
 
     hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id", ondelete="CASCADE"), index=True, nullable=False)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
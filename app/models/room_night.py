@@ -0,0 +1,16 @@
+from __future__ import annotations
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Date, Integer
+from datetime import date
+from app.models.base import Base
+
+class RoomNight(Base):
+    """
+    Calendário de inventário: unidades reservadas de um quarto em uma noite.
+    Noites sem linha não têm reservas (unidades livres = Room.total_units).
+    """
+    __tablename__ = "room_nights"
+
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    night: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    units_booked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
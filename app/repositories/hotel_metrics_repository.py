@@ -0,0 +1,45 @@
+from datetime import date
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.hotel import Hotel
+from app.models.hotel_booking_day import HotelBookingDay
+
+
+class HotelMetricsRepository:
+    """
+    Agregados incrementais usados em stars/popularidade. As operações são O(1) e não fazem
+    commit: devem rodar na mesma transação da escrita da avaliação/reserva.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_review(self, hotel_id: int, rating_delta: float, count_delta: int) -> None:
+        # UPDATE relativo: escritas concorrentes no mesmo hotel não perdem incrementos
+        self.db.execute(
+            update(Hotel)
+            .where(Hotel.id == hotel_id)
+            .values(
+                rating_sum=Hotel.rating_sum + rating_delta,
+                review_count=Hotel.review_count + count_delta
+            )
+        )
+
+    def add_booking(self, hotel_id: int, day: date, delta: int = 1) -> None:
+        stmt = insert(HotelBookingDay).values(hotel_id=hotel_id, day=day, bookings=max(delta, 0))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HotelBookingDay.hotel_id, HotelBookingDay.day],
+            set_={"bookings": HotelBookingDay.bookings + delta}
+        )
+        self.db.execute(stmt)
+
+    def bookings_since(self, hotel_id: int, since: date) -> int:
+        """
+        Reservas criadas a partir de `since`: soma de no máximo um bucket por dia da janela.
+        """
+        return self.db.query(func.coalesce(func.sum(HotelBookingDay.bookings), 0)).filter(
+            HotelBookingDay.hotel_id == hotel_id,
+            HotelBookingDay.day >= since
+        ).scalar()
@@ -1,24 +1,29 @@
+import json
 from math import radians, cos, sin, asin, sqrt
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional, Tuple
 
 from fastapi import HTTPException
 
-from sqlalchemy import func
+from sqlalchemy import Float, and_, func, null, exists, literal, or_, select, union
 from sqlalchemy.orm import Session, joinedload
 
 from app.models.hotel import Hotel
 from app.models.room import Room
 from app.models.media import Media
 from app.models.amenity import Amenity
+from app.models.base import hotel_amenities, room_amenities
 from app.schemas.hotel import HotelIn, HotelCard
 from app.schemas.room import RoomIn
 from app.schemas.media import MediaIn
 from app.schemas.hotel_filter import HotelFilter
-from app.schemas.pagination import Page, PageMeta
-from app.models.booking import Booking
+from app.schemas.pagination import Page, PageMeta, encode_cursor, decode_cursor
+from app.repositories.inventory_repository import InventoryRepository
 from app.settings import HotelSettings
 
 
+EARTH_RADIUS_KM = 6371
+
+
 class HotelRepository:
 
     # -------------------- GET --------------------
@@ -368,72 +373,243 @@ class HotelRepository:
         if filters.check_in and filters.check_out:
             room_avail_subq = self._min_price_subquery(db, filters.check_in, filters.check_out)
 
-        # Query principal
-        query = db.query(Hotel)
-        if room_avail_subq:
-            query = query.add_columns(room_avail_subq.c.min_price).outerjoin(
-                room_avail_subq, Hotel.id == room_avail_subq.c.hotel_id
-            )
+        # Ponto de interesse do usuário (distância calculada no banco, servida pelo índice espacial)
+        origin = None
+        if filters.user_lat is not None and filters.user_lng is not None:
+            origin = func.ll_to_earth(filters.user_lat, filters.user_lng)
+
+        min_price_col = (
+            room_avail_subq.c.min_price if room_avail_subq is not None else null()
+        ).label("min_price_available")
+        distance_col = (
+            self._distance_km_expr(origin) if origin is not None else null()
+        ).label("distance_km")
+
+        # Preço de referência: min_price_available com datas, min_price_general sem datas
+        price_subq = room_avail_subq
+        if price_subq is None and (self._has_price_filter(filters) or filters.sort == "price"):
+            price_subq = self._min_price_general_subquery(db)
+        price_col = price_subq.c.min_price if price_subq is not None else None
+
+        text_terms = self._text_terms(filters)
+
+        # Query principal: apenas as colunas do HotelCard (linhas simples, sem ORM/identity map)
+        query = db.query(*self._card_columns(), min_price_col, distance_col)
+        if price_subq is not None:
+            query = query.outerjoin(price_subq, Hotel.id == price_subq.c.hotel_id)
+        query = self._apply_filters(query, filters, price_col, origin, text_terms)
+
+        # Total: consulta enxuta, só com os joins exigidos pelos filtros (sem eager loads nem ordenação)
+        count_query = db.query(Hotel.id)
+        if self._has_price_filter(filters):
+            count_query = count_query.join(price_subq, Hotel.id == price_subq.c.hotel_id)
+        count_query = self._apply_filters(count_query, filters, price_col, origin, text_terms)
+
+        if filters.count == "estimate":
+            total, total_estimated = self._estimate_count(db, count_query), True
+        else:
+            total, total_estimated = count_query.with_entities(func.count(Hotel.id)).scalar(), False
+
+        # Ordenação: chaves do critério escolhido + Hotel.id como desempate estável
+        sort_keys = self._sort_keys(filters, price_col, origin, text_terms)
+        query = query.add_columns(*[expr.label(f"sort_key_{i}") for i, (expr, _) in enumerate(sort_keys)])
+        query = query.order_by(*[
+            expr.desc() if descending else expr.asc()
+            for expr, descending in sort_keys
+        ])
+
+        # Paginação: keyset quando há cursor, offset (page) caso contrário
+        if filters.cursor:
+            last_values = self._decode_search_cursor(filters, len(sort_keys))
+            query = query.filter(self._keyset_condition(sort_keys, last_values))
+        else:
+            query = query.offset((filters.page - 1) * filters.size)
+
+        # Busca um registro a mais para saber se existe próxima página
+        rows = query.limit(filters.size + 1).all()
+        has_next = len(rows) > filters.size
+        rows = rows[:filters.size]
+
+        items = [HotelCard(**row._mapping) for row in rows]
+
+        next_cursor = None
+        if has_next:
+            last_values = [rows[-1]._mapping[f"sort_key_{i}"] for i in range(len(sort_keys))]
+            next_cursor = encode_cursor({"sort": filters.sort, "keys": last_values})
+
+        return Page[HotelCard](
+            meta=PageMeta(
+                page=filters.page,
+                size=filters.size,
+                total=total,
+                total_estimated=total_estimated,
+                next_cursor=next_cursor
+            ),
+            items=items
+        )
 
-        query = query.options(
-            joinedload(Hotel.media), 
-            joinedload(Hotel.rooms).joinedload(Room.amenities) 
+    @staticmethod
+    def _card_columns():
+        """
+        Colunas do HotelCard calculadas no banco; preço geral e thumbnail são subconsultas
+        correlacionadas (índices por hotel_id), avaliadas só para as linhas da página.
+        """
+        min_price_general = (
+            select(func.min(Room.base_price))
+            .where(Room.hotel_id == Hotel.id, Room.total_units > 0)
+            .correlate(Hotel)
+            .scalar_subquery()
         )
+        thumbnail = (
+            select(Media.url)
+            .where(Media.hotel_id == Hotel.id)
+            .order_by(Media.id)
+            .limit(1)
+            .correlate(Hotel)
+            .scalar_subquery()
+        )
+        return [
+            Hotel.id,
+            Hotel.name,
+            Hotel.city,
+            Hotel.neighborhood,
+            Hotel.stars,
+            Hotel.popularity,
+            min_price_general.label("min_price_general"),
+            thumbnail.label("thumbnail"),
+        ]
+
+    def _apply_filters(self, query, filters: HotelFilter, price_col, origin, text_terms):
+        """
+        Aplica os critérios de HotelFilter (WHERE). Joins de preço ficam a cargo de quem chama.
+        """
+        # Filtros de texto e localização (sem acentos/maiúsculas, servidos pelos índices de trigramas)
+        for column, term in text_terms:
+            query = query.filter(self._folded(column).contains(self._folded(literal(term))))
+
+        # Estrelas
+        if filters.stars_min is not None:
+            query = query.filter(Hotel.stars >= filters.stars_min)
+        if filters.stars_max is not None:
+            query = query.filter(Hotel.stars <= filters.stars_max)
+
+        # Amenities: o hotel precisa oferecer todas as selecionadas (no próprio hotel ou em algum quarto)
+        if filters.amenities:
+            query = query.filter(Hotel.id.in_(self._hotels_with_amenities_query(filters.amenities)))
+
+        # Tipo de quarto
+        if filters.room_type:
+            query = query.filter(
+                exists().where(Room.hotel_id == Hotel.id, Room.room_type == filters.room_type)
+            )
+
+        # Faixa de preço
+        if filters.price_min is not None:
+            query = query.filter(price_col >= filters.price_min)
+        if filters.price_max is not None:
+            query = query.filter(price_col <= filters.price_max)
+
+        # Filtro por raio: earth_box usa o índice GiST, earth_distance refina o círculo
+        if origin is not None and filters.radius_km is not None:
+            radius = self._earth_radius_expr(filters.radius_km)
+            query = query.filter(
+                func.earth_box(origin, radius).op("@>")(self._earth_location()),
+                func.earth_distance(origin, self._earth_location()) <= radius
+            )
+
+        return query
 
-        # Filtros de texto e localização
-        if filters.q:
-            query = query.filter(Hotel.name.ilike(f"%{filters.q}%"))
-        if filters.city:
-            query = query.filter(Hotel.city.ilike(f"%{filters.city}%"))
-        if filters.neighborhood:
-            query = query.filter(Hotel.neighborhood.ilike(f"%{filters.neighborhood}%"))
-
-        # Ordenação
-        if filters.sort == "price" and room_avail_subq:
-            query = query.order_by(room_avail_subq.c.min_price.asc().nullslast())
+    @staticmethod
+    def _has_price_filter(filters: HotelFilter) -> bool:
+        return filters.price_min is not None or filters.price_max is not None
+
+    @staticmethod
+    def _estimate_count(db: Session, query) -> int:
+        """
+        Estimativa de linhas do planner (EXPLAIN), sem executar a consulta.
+        """
+        sql, params = HotelRepository._explain_sql(query, db.get_bind().dialect)
+        plan = db.connection().exec_driver_sql(sql, params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def _explain_sql(query, dialect) -> Tuple[str, dict]:
+        """
+        SQL do EXPLAIN e parâmetros para o driver. render_postcompile expande os IN (...) em parâmetros
+        comuns; sem ele o SQL levaria placeholders __[POSTCOMPILE_...] que o driver não entende.
+        """
+        compiled = query.statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        return "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+
+    def _sort_keys(self, filters: HotelFilter, price_col, origin, text_terms) -> List[Tuple[Any, bool]]:
+        """
+        Retorna as chaves de ordenação (expressão, decrescente?) do critério escolhido,
+        sempre terminando em Hotel.id para que o cursor seja estável.
+        """
+        if filters.sort == "price" and price_col is not None:
+            # Hotéis sem preço ficam no fim (equivalente a NULLS LAST, mas comparável no keyset)
+            keys = [(func.coalesce(price_col, float("inf")), False)]
         elif filters.sort == "popularity":
-            query = query.order_by(Hotel.popularity.desc())
-        elif filters.sort == "stars":
-            query = query.order_by(Hotel.stars.desc())
+            keys = [(Hotel.popularity, True)]
+        elif filters.sort == "rating":
+            keys = [(Hotel.stars, True)]
+        elif filters.sort == "relevance" and text_terms:
+            keys = [(self._relevance_expr(text_terms), True)]
+        elif filters.sort == "distance" and origin is not None:
+            # Operador KNN (<->) percorre o índice GiST em ordem de proximidade (ordem global correta)
+            keys = [(self._earth_location().op("<->", return_type=Float)(origin), False)]
         else:
-            query = query.order_by(Hotel.id.asc())
-
-        total = query.count()
-        hotels = query.offset((filters.page - 1) * filters.size).limit(filters.size).all()
-
-        items = []
-        for result in hotels:
-            hotel, min_price_available = (result if room_avail_subq else (result, None))
-            min_price_general = self.calculate_min_price_general(hotel)
-
-            thumbnail = hotel.media[0].url if hotel.media else None
-            distance_km = None
-            if filters.user_lat is not None and filters.user_lng is not None:
-                distance_km = HotelRepository.haversine(
-                    filters.user_lat, filters.user_lng, hotel.latitude, hotel.longitude
-                )
-
-            items.append(HotelCard(
-                id=hotel.id,
-                name=hotel.name,
-                city=hotel.city,
-                neighborhood=hotel.neighborhood,
-                stars=hotel.stars,
-                popularity=hotel.popularity,
-                min_price=min_price_available,
-                min_price_general=min_price_general,
-                distance_km=distance_km,
-                thumbnail=thumbnail
-            ))
+            keys = []
 
-        # Ordenação por distância, feita em Python
-        if filters.sort == "distance" and filters.user_lat is not None and filters.user_lng is not None:
-            items.sort(key=lambda x: (x.distance_km if x.distance_km is not None else float('inf')))
+        return keys + [(Hotel.id, False)]
 
-        return Page[HotelCard](
-            meta=PageMeta(page=filters.page, size=filters.size, total=total),
-            items=items
+    @staticmethod
+    def _keyset_condition(sort_keys: List[Tuple[Any, bool]], last_values: List[Any]):
+        """
+        Condição "vem depois de last_values" para chaves com direções mistas:
+        (k1 após v1) OR (k1 = v1 AND ((k2 após v2) OR ...)).
+        """
+        condition = None
+        for (expr, descending), value in reversed(list(zip(sort_keys, last_values))):
+            after = expr < value if descending else expr > value
+            condition = after if condition is None else or_(after, and_(expr == value, condition))
+        return condition
+
+    @staticmethod
+    def _decode_search_cursor(filters: HotelFilter, key_count: int) -> List[Any]:
+        """
+        Decodifica o cursor de search, validando que foi gerado para o mesmo critério de ordenação.
+        """
+        try:
+            payload = decode_cursor(filters.cursor)
+            if payload.get("sort") != filters.sort or len(payload.get("keys", [])) != key_count:
+                raise ValueError("cursor does not match the requested sort")
+        except (ValueError, AttributeError):
+            raise HTTPException(
+                status_code=422,
+                detail=[{
+                    "loc": ["query", "cursor"],
+                    "msg": "Invalid cursor for this search. Start again without cursor.",
+                    "type": "value_error.cursor",
+                    "input": filters.cursor
+                }]
+            )
+        return payload["keys"]
+
+    # -------------------- EXPORT --------------------
+    def stream_cards(self, db: Session, batch_size: int) -> Iterator[dict]:
+        """
+        Percorre o catálogo inteiro com cursor no servidor (yield_per), em lotes de batch_size linhas.
+        """
+        stmt = (
+            select(*self._card_columns())
+            .order_by(Hotel.id.asc())
+            .execution_options(yield_per=batch_size)
         )
+        for row in db.execute(stmt):
+            yield dict(row._mapping)
 
     def _validate_proximity(self, db: Session, lat: float, lng: float, city: str, exclude_id: Optional[int] = None):
         radius_meters = HotelSettings.PROXIMITY_RADIUS_METERS
@@ -472,26 +648,66 @@ class HotelRepository:
         dlat = lat2 - lat1
         a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
         c = 2 * asin(sqrt(a))
-        km = 6371 * c
+        km = EARTH_RADIUS_KM * c
         return km
 
     # -------------------- PRIVATE --------------------
+    @staticmethod
+    def _folded(expr):
+        """
+        Normalização usada na busca textual (mesma expressão dos índices ix_hotels_*_trgm).
+        """
+        return func.f_unaccent(func.lower(expr))
+
+    @staticmethod
+    def _text_terms(filters: HotelFilter):
+        """
+        Pares (coluna, termo) dos filtros textuais informados.
+        """
+        terms = [
+            (Hotel.name, filters.q),
+            (Hotel.city, filters.city),
+            (Hotel.neighborhood, filters.neighborhood),
+        ]
+        return [(column, term) for column, term in terms if term]
+
+    @classmethod
+    def _relevance_expr(cls, text_terms):
+        """
+        Relevância textual: soma da similaridade de trigramas de cada termo com sua coluna.
+        """
+        scores = [
+            func.coalesce(func.word_similarity(cls._folded(literal(term)), cls._folded(column)), 0)
+            for column, term in text_terms
+        ]
+        return sum(scores[1:], scores[0])
+
+    @staticmethod
+    def _earth_location():
+        """
+        Posição do hotel como ponto earthdistance (mesma expressão do índice ix_hotels_earth_location).
+        """
+        return func.ll_to_earth(Hotel.latitude, Hotel.longitude)
+
+    @staticmethod
+    def _earth_radius_expr(radius_km: float):
+        """
+        Converte km (esfera de 6371 km, como no haversine) para a escala de earth(), usada por earth_box/earth_distance.
+        """
+        return radius_km / EARTH_RADIUS_KM * func.earth()
+
+    @classmethod
+    def _distance_km_expr(cls, origin):
+        """
+        Distância em km entre o ponto de interesse e o hotel, equivalente ao haversine.
+        """
+        return func.earth_distance(origin, cls._earth_location()) / func.earth() * EARTH_RADIUS_KM
+
     def _min_price_subquery(self, db: Session, check_in: str, check_out: str):
         """
-        Retorna subquery com min_price disponível por hotel, considerando reservas no período informado.
+        Retorna subquery com min_price disponível por hotel, considerando o calendário de inventário no período informado.
         """
-        booked_subq = (
-            db.query(
-                Booking.room_id.label("room_id"),
-                func.coalesce(func.sum(Booking.rooms_booked), 0).label("rooms_booked")
-            )
-            .filter(
-                Booking.check_in < check_out,
-                Booking.check_out > check_in
-            )
-            .group_by(Booking.room_id)
-            .subquery()
-        )
+        booked_subq = InventoryRepository(db).booked_units_subquery(check_in, check_out)
 
         room_avail_subq = (
             db.query(
@@ -506,6 +722,47 @@ class HotelRepository:
 
         return room_avail_subq
 
+    def _min_price_general_subquery(self, db: Session):
+        """
+        Retorna subquery com min_price geral por hotel (sem considerar datas).
+        """
+        return (
+            db.query(
+                Room.hotel_id.label("hotel_id"),
+                func.min(Room.base_price).label("min_price")
+            )
+            .filter(Room.total_units > 0)
+            .group_by(Room.hotel_id)
+            .subquery()
+        )
+
+    @staticmethod
+    def _hotels_with_amenities_query(amenity_ids: List[int]):
+        """
+        IDs de hotéis que oferecem todas as amenities informadas, no hotel ou em algum de seus quartos.
+        """
+        amenity_ids = set(amenity_ids)
+
+        hotel_level = select(
+            hotel_amenities.c.hotel_id.label("hotel_id"),
+            hotel_amenities.c.amenity_id.label("amenity_id")
+        ).where(hotel_amenities.c.amenity_id.in_(amenity_ids))
+
+        room_level = select(
+            Room.hotel_id.label("hotel_id"),
+            room_amenities.c.amenity_id.label("amenity_id")
+        ).join(room_amenities, room_amenities.c.room_id == Room.id).where(
+            room_amenities.c.amenity_id.in_(amenity_ids)
+        )
+
+        offered = union(hotel_level, room_level).subquery()
+
+        return (
+            select(offered.c.hotel_id)
+            .group_by(offered.c.hotel_id)
+            .having(func.count(offered.c.amenity_id) == len(amenity_ids))
+        )
+
     @staticmethod
     def calculate_min_price_general(hotel: Hotel) -> Optional[float]:
         if hotel.rooms:
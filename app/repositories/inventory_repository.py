@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.room_night import RoomNight
+
+
+class InventoryRepository:
+    """
+    Mantém o calendário de inventário (room_nights). As operações não fazem commit:
+    devem rodar na mesma transação da escrita da reserva.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def nights(check_in: date, check_out: date) -> List[date]:
+        return [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+
+    def reserve(self, room_id: int, check_in: date, check_out: date, units: int, total_units: int) -> None:
+        """
+        Soma `units` às noites [check_in, check_out) do quarto, sem ultrapassar total_units.
+        O upsert bloqueia a linha de cada noite até o fim da transação, então reservas concorrentes
+        do mesmo quarto/noite são serializadas pelo banco. Lança 409 se alguma noite estiver lotada;
+        quem chama deve fazer rollback.
+        """
+        nights = self.nights(check_in, check_out)
+        if not nights:
+            return
+        if units > total_units:
+            raise self._unavailable(room_id)
+
+        stmt = insert(RoomNight).values([
+            {"room_id": room_id, "night": night, "units_booked": units}
+            for night in nights
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RoomNight.room_id, RoomNight.night],
+            set_={"units_booked": RoomNight.units_booked + stmt.excluded.units_booked},
+            # Noites sem saldo não são atualizadas e, portanto, não voltam no RETURNING
+            where=(RoomNight.units_booked + stmt.excluded.units_booked) <= total_units
+        ).returning(RoomNight.night)
+
+        reserved = self.db.execute(stmt).all()
+        if len(reserved) < len(nights):
+            raise self._unavailable(room_id)
+
+    def release(self, room_id: int, check_in: date, check_out: date, units: int) -> None:
+        """
+        Devolve `units` às noites [check_in, check_out) do quarto.
+        """
+        self.db.execute(
+            update(RoomNight)
+            .where(
+                RoomNight.room_id == room_id,
+                RoomNight.night >= check_in,
+                RoomNight.night < check_out
+            )
+            .values(units_booked=RoomNight.units_booked - units)
+        )
+
+    def booked_by_night(self, room_ids: List[int], check_in: date, check_out: date) -> Dict[Tuple[int, date], int]:
+        """
+        Unidades reservadas por (quarto, noite) em [check_in, check_out); noites ausentes estão livres.
+        """
+        if not room_ids:
+            return {}
+        rows = self.db.query(RoomNight.room_id, RoomNight.night, RoomNight.units_booked).filter(
+            RoomNight.room_id.in_(room_ids),
+            RoomNight.night >= check_in,
+            RoomNight.night < check_out
+        )
+        return {(row.room_id, row.night): row.units_booked for row in rows}
+
+    @staticmethod
+    def _unavailable(room_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=409,
+            detail=f"Quarto {room_id} sem unidades disponíveis no período solicitado"
+        )
+
+    def booked_units_subquery(self, check_in: date, check_out: date):
+        """
+        Subquery (room_id, rooms_booked) com o pico de unidades reservadas por quarto no período.
+        """
+        return (
+            self.db.query(
+                RoomNight.room_id.label("room_id"),
+                func.max(RoomNight.units_booked).label("rooms_booked")
+            )
+            .filter(
+                RoomNight.night >= check_in,
+                RoomNight.night < check_out
+            )
+            .group_by(RoomNight.room_id)
+            .subquery()
+        )
@@ -1,6 +1,14 @@
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 from app.models.user import User
 
+# Colunas expostas em UserOut (nunca a senha)
+USER_OUT_COLUMNS = (
+    User.id, User.userName, User.role, User.birthDate, User.emailAddress,
+    User.phoneNumber, User.firstName, User.lastName, User.address,
+)
+
 class UserRepository:
   def __init__(self, db: Session):
       self.db = db
@@ -8,8 +16,49 @@ class UserRepository:
   def get_by_id(self, id: str) -> User | None:
       return self.db.query(User).filter(id == User.id).first()
   
+  def get_principal(self, id: str):
+      # Só as colunas do principal (id, role, userName)
+      return self.db.query(User.id, User.role, User.userName).filter(id == User.id).first()
+  
   def get_by_username(self, username: str) -> User | None:
       return self.db.query(User).filter(username == User.userName).first()
   
-  def get_all_users(self) -> User | None:
-      return self.db.query(User).all()
+  # -------------------- LISTAGEM --------------------
+  def count(self, role: Optional[str], name_prefix: Optional[str]) -> int:
+      return self.db.query(func.count(User.id)).filter(*self._conditions(role, name_prefix)).scalar()
+
+  def list_page(self, role: Optional[str], name_prefix: Optional[str],
+                after: Optional[Tuple[str, str]], limit: int) -> List[dict]:
+      """
+      Página em ordem (userName, id), por keyset a partir de after. Só as colunas de UserOut.
+      """
+      stmt = select(*USER_OUT_COLUMNS).where(*self._conditions(role, name_prefix))
+      if after:
+          stmt = stmt.where(tuple_(User.userName, User.id) > after)
+      stmt = stmt.order_by(User.userName.asc(), User.id.asc()).limit(limit)
+      return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+  def stream(self, role: Optional[str], name_prefix: Optional[str], batch_size: int) -> Iterator[dict]:
+      """
+      Percorre todos os usuários filtrados com cursor no servidor (yield_per), em lotes de batch_size linhas.
+      """
+      stmt = (
+          select(*USER_OUT_COLUMNS)
+          .where(*self._conditions(role, name_prefix))
+          .order_by(User.userName.asc(), User.id.asc())
+          .execution_options(yield_per=batch_size)
+      )
+      for row in self.db.execute(stmt):
+          yield dict(row._mapping)
+
+  @staticmethod
+  def _conditions(role: Optional[str], name_prefix: Optional[str]) -> list:
+      # role usa ix_users_role; o limite inferior em userName deixa ix_users_userName
+      # posicionar o scan no prefixo, e o startswith garante o casamento exato
+      conditions = []
+      if role:
+          conditions.append(User.role == role)
+      if name_prefix:
+          conditions.append(User.userName >= name_prefix)
+          conditions.append(User.userName.startswith(name_prefix, autoescape=True))
+      return conditions
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 from app.models.booking import Booking
-from app.models.room import Room
-from app.models.hotel import Hotel
 from app.schemas.user import User
 from app.services.auth_service import get_current_user
-from app.schemas.booking import BookingCreate, BookingOut, BookingUpdate, BookingWithDetails
-from typing import List
+from app.schemas.booking import BookingBulkCreate, BookingCreate, BookingHoldOut, BookingOut, BookingUpdate, BookingWithDetails
+from typing import Annotated, List, Optional
 from sqlalchemy.orm import joinedload
-from app.services.hotel_metrics_service import HotelMetricsService 
+from app.services.booking_service import BookingService
+from app.services.idempotency import run_idempotent
+from app.schemas.booking_filter import BookingFilter
+from app.schemas.pagination import Page
 
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
@@ -19,63 +20,83 @@ router = APIRouter(prefix="/bookings", tags=["bookings"])
 def create_booking(
     booking_data: BookingCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
-    metrics_service = HotelMetricsService(db) 
-    
-    # Verifica quarto
-    room = db.query(Room).filter(Room.id == booking_data.room_id).first()
-    if not room:
-        raise HTTPException(status_code=404, detail=f"Quarto {booking_data.room_id} não encontrado")
-
-    # Verifica hotel
-    hotel = db.query(Hotel).filter(Hotel.id == booking_data.hotel_id).first()
-    if not hotel:
-        raise HTTPException(status_code=404, detail=f"Hotel {booking_data.hotel_id} não encontrado")
-    
-    hotel_id = booking_data.hotel_id 
-
-    new_booking = Booking(
-        user_id=current_user.id,
-        hotel_id=hotel_id,
-        room_id=booking_data.room_id,
-        check_in=booking_data.check_in,
-        check_out=booking_data.check_out,
-        rooms_booked=booking_data.rooms_booked or 1,
+    """
+    Cria a reserva e ocupa o inventário de cada noite na mesma transação.
+    Retorna 409 se o quarto não tiver unidades livres em alguma noite do período.
+    Com Idempotency-Key, novas tentativas recebem a resposta original sem criar outra reserva.
+    """
+    service = BookingService(db)
+    return run_idempotent(
+        idempotency_key,
+        scope=f"bookings:{current_user.id}",
+        payload=booking_data,
+        action=lambda: service.create_booking(booking_data, current_user)
     )
 
-    db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
-
-    # Dispara o recálculo da popularidade
-    metrics_service.calculate_and_update_metrics(hotel_id)
-
-    # Retorna com hotel e quarto carregados
-    return db.query(Booking)\
-        .options(
-            joinedload(Booking.hotel),
-            joinedload(Booking.room)
-        )\
-        .filter(Booking.id == new_booking.id)\
-        .first()
+# ------------------- CREATE EM LOTE -------------------
+@router.post("/bulk", response_model=List[BookingWithDetails])
+def create_bookings_bulk(
+    payload: BookingBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cria até 100 reservas de uma vez (agências/grupos). Tudo ou nada: qualquer item inválido (422)
+    ou sem disponibilidade (409) desfaz o lote inteiro.
+    """
+    service = BookingService(db)
+    return service.create_bookings_bulk(payload.bookings, current_user)
+
+# ------------------- HOLDS -------------------
+@router.post("/holds", response_model=BookingHoldOut, status_code=201)
+def create_hold(
+    hold_data: BookingCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bloqueia o inventário durante o checkout até expires_at. Retorna 409 se não houver unidades livres.
+    """
+    service = BookingService(db)
+    return service.create_hold(hold_data, current_user)
+
+@router.post("/holds/{hold_id}/confirm", response_model=BookingWithDetails)
+def confirm_hold(
+    hold_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Converte o hold em reserva. Retorna 409 se o hold já tiver expirado.
+    """
+    service = BookingService(db)
+    return service.confirm_hold(hold_id, current_user)
+
+@router.delete("/holds/{hold_id}", response_model=dict)
+def release_hold(
+    hold_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    service = BookingService(db)
+    service.release_hold(hold_id, current_user)
+    return {"message": f"Hold {hold_id} released successfully"}
 
 # ------------------- READ ALL (SÓ DO USUÁRIO LOGADO) -------------------
-@router.get("/", response_model=List[BookingWithDetails])
+@router.get("/", response_model=Page[BookingWithDetails])
 def get_bookings(
+    filters: Annotated[BookingFilter, Query()],
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    bookings = (
-        db.query(Booking)
-        .filter(Booking.user_id == current_user.id)
-        .options(
-            joinedload(Booking.hotel),
-            joinedload(Booking.room)
-        )
-        .all()
-    )
-    return bookings
+    """
+    Histórico paginado do usuário. Para a próxima página, envie meta.next_cursor no parâmetro cursor.
+    """
+    service = BookingService(db)
+    return service.list_bookings(filters, current_user)
 
 # ------------------- READ SINGLE -------------------
 @router.get("/{booking_id}", response_model=BookingWithDetails)
@@ -107,49 +128,8 @@ def update_booking(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    booking = (
-        db.query(Booking)
-        .filter(Booking.id == booking_id, Booking.user_id == current_user.id)
-        .first()
-    )
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-
-    # Atualiza datas
-    if booking_update.check_in is not None:
-        booking.check_in = booking_update.check_in
-    if booking_update.check_out is not None:
-        booking.check_out = booking_update.check_out
-
-    # Atualiza room_id somente se o quarto existe
-    if booking_update.room_id is not None:
-        room = db.query(Room).filter(Room.id == booking_update.room_id).first()
-        if not room:
-            raise HTTPException(status_code=404, detail=f"Room with id {booking_update.room_id} not found")
-        booking.room_id = booking_update.room_id
-
-    # Atualiza hotel_id somente se o hotel existe
-    if booking_update.hotel_id is not None:
-        hotel = db.query(Hotel).filter(Hotel.id == booking_update.hotel_id).first()
-        if not hotel:
-            raise HTTPException(status_code=404, detail=f"Hotel with id {booking_update.hotel_id} not found")
-        booking.hotel_id = booking_update.hotel_id
-
-    # Atualiza quantidade de quartos
-    if booking_update.rooms_booked is not None:
-        booking.rooms_booked = booking_update.rooms_booked
-
-    db.commit()
-    
-    # Recarrega com relacionamentos
-    db.refresh(booking)
-    return db.query(Booking)\
-        .options(
-            joinedload(Booking.hotel),
-            joinedload(Booking.room)
-        )\
-        .filter(Booking.id == booking_id)\
-        .first()
+    service = BookingService(db)
+    return service.update_booking(booking_id, booking_update, current_user)
 
 # ------------------- DELETE -------------------
 @router.delete("/{booking_id}", response_model=dict)
@@ -158,22 +138,6 @@ def delete_booking(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    metrics_service = HotelMetricsService(db)
-
-    booking = (
-        db.query(Booking)
-        .filter(Booking.id == booking_id, Booking.user_id == current_user.id)
-        .first()
-    )
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-
-    hotel_id = booking.hotel_id
-    
-    db.delete(booking)
-    db.commit()
-    
-    # Dispara o recálculo da popularidade
-    metrics_service.calculate_and_update_metrics(hotel_id)
-    
-    return {"message": f"Booking {booking_id} deleted successfully"}
\ No newline at end of file
+    service = BookingService(db)
+    service.delete_booking(booking_id, current_user)
+    return {"message": f"Booking {booking_id} deleted successfully"}
@@ -1,13 +1,20 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import Annotated, List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.database.database import get_db
 from app.services.hotel_service import HotelService
+from app.services.auth_service import get_optional_user
+from app.services.idempotency import run_idempotent
 from app.schemas.hotel import HotelIn, HotelDetail, HotelCard
+from app.schemas.availability import HotelAvailability
 from app.schemas.room import RoomIn
 from app.schemas.media import MediaIn
 from app.schemas.hotel_filter import HotelFilter
+from app.schemas.pagination import Page
+from app.schemas.token import TokenData
 
 router = APIRouter(prefix="/hotels", tags=["hotels"])
 
@@ -15,27 +22,62 @@ router = APIRouter(prefix="/hotels", tags=["hotels"])
 @router.get("/", response_model=List[HotelCard])
 def get_all_hotels(db: Session = Depends(get_db)):
     """
-    Retorna todos os hotéis cadastrados.
+    Retorna a primeira página de hotéis. Para o catálogo completo, use GET /hotels/export.
     """
     service = HotelService(db)
     
     return service.get_all_hotels()
 
 # -------------------- SEARCH --------------------
-@router.get("/search")
-def search_hotels(filters: HotelFilter = Depends(), db: Session = Depends(get_db)):
+@router.get("/search", response_model=Page[HotelCard])
+def search_hotels(filters: Annotated[HotelFilter, Query()], db: Session = Depends(get_db)):
+    """
+    Busca paginada de hotéis. Para rolagem infinita, envie meta.next_cursor no parâmetro cursor.
+    """
     service = HotelService(db)
     return service.search(filters, user_lat=filters.user_lat, user_lng=filters.user_lng)
 
 
+# -------------------- EXPORT --------------------
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/export", response_class=StreamingResponse)
+def export_hotels(format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    Exporta o catálogo completo (um HotelCard por linha) em streaming, com memória constante.
+    """
+    return StreamingResponse(
+        HotelService.export_catalog(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=hotels.{format}"}
+    )
+
+
 # -------------------- CREATE FULL HOTEL --------------------
 @router.post("/full", response_model=HotelDetail)
-def create_full_hotel(hotel_in: HotelIn, db: Session = Depends(get_db)):
+def create_full_hotel(
+    hotel_in: HotelIn,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: Optional[TokenData] = Depends(get_optional_user)
+):
     """
     Cria o hotel junto com rooms, media e amenities em um único payload.
-    """
+    Com Idempotency-Key, novas tentativas recebem a resposta original sem criar outro hotel.
+    As chaves são por principal, então o Idempotency-Key exige autenticação: o mesmo valor
+    enviado por usuários diferentes não colide.
+    """
+    if idempotency_key and not current_user:
+        raise HTTPException(status_code=401,
+                            detail="Idempotency-Key requires authentication",
+                            headers={"WWW-Authenticate": "Bearer"})
     service = HotelService(db)
-    return service.create_full(hotel_in)
+    return run_idempotent(
+        idempotency_key,
+        scope=f"hotels:full:{current_user.id}" if current_user else "hotels:full",
+        payload=hotel_in,
+        action=lambda: HotelDetail.model_validate(service.create_full(hotel_in))
+    )
 
 
 # -------------------- CREATE HOTEL --------------------
@@ -74,6 +116,22 @@ def get_hotel(
     return hotel
 
 
+# -------------------- AVAILABILITY --------------------
+@router.get("/{hotel_id}/availability", response_model=HotelAvailability)
+def get_hotel_availability(
+    hotel_id: int,
+    check_in: date,
+    check_out: date,
+    db: Session = Depends(get_db)
+):
+    """
+    Unidades livres e preço por quarto e por noite em [check_in, check_out), até 90 noites.
+    Pensado para calendários de disponibilidade no frontend.
+    """
+    service = HotelService(db)
+    return service.get_availability(hotel_id, check_in, check_out)
+
+
 # -------------------- UPDATE HOTEL --------------------
 @router.put("/{hotel_id}", response_model=HotelDetail)
 def update_hotel(hotel_id: int, hotel_in: HotelIn, db: Session = Depends(get_db)):
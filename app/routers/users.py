@@ -1,15 +1,22 @@
-from typing import Optional, List
+import logging
+from typing import Annotated, Literal, Optional
 from pydantic import ValidationError
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from ..services import auth_service
 from ..schemas.user import User, UserOut, UserSignup
+from ..schemas.user_filter import UserFilter
+from ..schemas.pagination import Page
 from app.models.user import User as ORMUser
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 from ..services.user_service import UserBusinessRulesService, UserDatabaseService
-from fastapi.responses import JSONResponse
+from ..services.principal_cache import principal_cache
+from ..services.password_hasher import password_hasher
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 
+logger = logging.getLogger("aluga-api")
+
 router = APIRouter(
     prefix="/users",
     tags=["users"]
@@ -21,23 +28,39 @@ router = APIRouter(
 def bar():
     return;
 
-# @router.get("/", dependencies=[Depends(auth_service.check_admin_role)])
-# def read_root(db: Session = Depends(get_db)):
-#     userList: list[User] = [User.model_validate(user) for user in UserDatabaseService(db).get_all_users()]
-#     return userList
-@router.get("/", response_model=List[User], dependencies=[Depends(auth_service.check_admin_role)])
-def read_root(db: Session = Depends(get_db)):
-    users = UserDatabaseService(db).get_all_users()  # list of ORM User instances
-    return users  # Let FastAPI + Pydantic serialize, with orm_mode=True on User model
+@router.get("/", response_model=Page[UserOut], dependencies=[Depends(auth_service.check_admin_role)])
+def read_root(filters: Annotated[UserFilter, Query()], db: Session = Depends(get_db)):
+    """
+    Listagem paginada de usuários (filtro por role e prefixo do userName). Para a próxima página,
+    envie meta.next_cursor no parâmetro cursor. Para a base completa, use GET /users/export.
+    """
+    page = UserDatabaseService(db).list_users(filters)
+    # Serializa direto: o response_model revalidaria cada usuário com os validadores de entrada
+    return Response(content=page.model_dump_json(), media_type="application/json")
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/export", response_class=StreamingResponse, dependencies=[Depends(auth_service.check_admin_role)])
+def export_users(filters: Annotated[UserFilter, Query()], format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    Exporta os usuários filtrados (um UserOut por linha) em streaming, com memória constante.
+    size e cursor são ignorados.
+    """
+    return StreamingResponse(
+        UserDatabaseService.export_users(filters, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"}
+    )
 
 @router.get("/me")
-def get_self(current_user: User = Depends(auth_service.get_current_user)):
+def get_self(current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+    # O principal em cache só tem id/role/userName; o perfil completo vem do banco
     if current_user:
-        return UserOut.model_validate(current_user)
+        return UserOut.model_validate(UserDatabaseService(db).get_by_id(current_user.id))
     raise HTTPException(status_code=404, detail="User not found")
 
 @router.put("/me", response_model=User)
-async def update_user(payload: dict, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+def update_user(payload: dict, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
     if current_user == None:
         raise HTTPException(status_code=404, detail="User not found")
     fetchedUser: ORMUser = UserDatabaseService(db).get_by_id(current_user.id)
@@ -52,21 +75,25 @@ async def update_user(payload: dict, current_user: User = Depends(auth_service.g
             setattr(fetchedUser, key, value)
 
     try:
-        _ = User.model_validate(fetchedUser)
+        # Sem nova senha no payload, o campo contém o hash armazenado
+        _ = User.model_validate(fetchedUser, context={"stored_password": "password" not in payload})
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=jsonable_encoder(e.errors()))
+    if "password" in payload:
+        fetchedUser.password = password_hasher.hash(payload["password"])
     
     db.commit()
+    principal_cache.invalidate_user(current_user.id)
     db.refresh(fetchedUser)
     response = JSONResponse(content={"message": f"User {fetchedUser.userName} updated successfully"})
     return response
 
-@router.get("/{userName}", response_model=Optional[User], dependencies=[Depends(auth_service.check_admin_role)])
+@router.get("/{userName}", response_model=Optional[UserOut], dependencies=[Depends(auth_service.check_admin_role)])
 def query_user(userName: str, db: Session = Depends(get_db)):
     return UserDatabaseService(db).get_by_username(userName)
 
 @router.put("/{userName}", response_model=Optional[User])
-async def update_user(userName: str, payload: dict, current_user: User = Depends(auth_service.check_admin_role), db: Session = Depends(get_db)):
+def update_user(userName: str, payload: dict, current_user: User = Depends(auth_service.check_admin_role), db: Session = Depends(get_db)):
     fetchedUser: ORMUser = UserDatabaseService(db).get_by_username(userName)
     if not fetchedUser:
         raise HTTPException(status_code=404, detail="User not found")
@@ -79,8 +106,13 @@ async def update_user(userName: str, payload: dict, current_user: User = Depends
             setattr(fetchedUser, key, value)
 
     try:
-        _ = User.model_validate(fetchedUser)
+        # Sem nova senha no payload, o campo contém o hash armazenado
+        _ = User.model_validate(fetchedUser, context={"stored_password": "password" not in payload})
+        if "password" in payload:
+            fetchedUser.password = password_hasher.hash(payload["password"])
+        user_id = fetchedUser.id
         db.commit()
+        principal_cache.invalidate_user(user_id)
         db.refresh(fetchedUser)
         response = JSONResponse(content={"message": f"User {fetchedUser.userName} updated successfully"})
         return response
@@ -90,25 +122,31 @@ async def update_user(userName: str, payload: dict, current_user: User = Depends
 @router.delete("/{userName}", dependencies=[Depends(auth_service.check_admin_role)])
 def delete_user(userName: str, db: Session = Depends(get_db)):
     fetchedUser: User = UserDatabaseService(db).get_by_username(userName)
+    if not fetchedUser:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_id = fetchedUser.id
     try:
         db.delete(fetchedUser)
         db.commit() 
+        principal_cache.invalidate_user(user_id)
     except:
         raise HTTPException(status_code=422, detail="Unprocessable Entity")
     return JSONResponse(content={"message": f"{fetchedUser.userName} deleted successfully"}, status_code=status.HTTP_200_OK)
 
 @router.post("/", response_model=Optional[User])
-async def create_user(user: User, db: Session = Depends(get_db)):
-    print(user)
+def create_user(user: User, db: Session = Depends(get_db)):
     if UserDatabaseService(db).check_exists(user.userName):
         try:
-            new_user = ORMUser(**user.model_dump())
-            print(new_user.birthDate)
+            new_user = ORMUser(**user.model_dump(exclude={"password"}), password=password_hasher.hash(user.password))
             db.add(new_user)
             db.commit()
             db.refresh(new_user)
+        except HTTPException:
+            # 503 do password_hasher saturado
+            raise
         except:
             raise HTTPException(status_code=422, detail="Unprocessable Entity")    
         
+    logger.info("user created", extra={"user_id": user.id})
     response = JSONResponse(content={"message": f"User {user.userName} created successfully"})
     return response
@@ -0,0 +1,32 @@
+import argparse
+import sys
+import time
+
+from app.database.database import SessionLocal
+from app.services.hotel_metrics_service import HotelMetricsService
+
+def run_metrics_batch(rebuild_counters: bool = False):
+    db = SessionLocal()
+    try:
+        print("Recalculando métricas dos hotéis...")
+        start = time.perf_counter()
+        report = HotelMetricsService(db).recalculate_all(rebuild_counters=rebuild_counters)
+        for step, stats in report.items():
+            print(f"  {step}: {stats['rows']} linhas em {stats['seconds']}s ({stats['rows_per_second']} linhas/s)")
+        print(f"Métricas recalculadas em {round(time.perf_counter() - start, 3)}s")
+    except Exception as e:
+        db.rollback()
+        print("Erro ao recalcular métricas:", e)
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula stars e popularidade de todos os hotéis")
+    parser.add_argument(
+        "--rebuild-counters",
+        action="store_true",
+        help="reconstrói os agregados incrementais a partir de reviews e bookings antes do recálculo",
+    )
+    args = parser.parse_args()
+    run_metrics_batch(rebuild_counters=args.rebuild_counters)
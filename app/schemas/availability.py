@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List
+
+# -------------------- SAÍDA --------------------
+class NightAvailability(BaseModel):
+    night: date
+    units_left: int
+    price: float
+
+class RoomAvailability(BaseModel):
+    room_id: int
+    name: str
+    room_type: str
+    total_units: int
+    nights: List[NightAvailability]
+
+class HotelAvailability(BaseModel):
+    hotel_id: int
+    check_in: date
+    check_out: date
+    rooms: List[RoomAvailability]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 class BookingCreate(BaseModel):
     hotel_id: int
@@ -9,6 +9,21 @@ class BookingCreate(BaseModel):
     check_out: date
     rooms_booked: int = Field(default=1, ge=1)
 
+class BookingBulkCreate(BaseModel):
+    bookings: List[BookingCreate] = Field(..., min_length=1, max_length=100)
+
+class BookingHoldOut(BaseModel):
+    id: int
+    hotel_id: int
+    room_id: int
+    check_in: date
+    check_out: date
+    rooms_booked: int
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class BookingUpdate(BaseModel):
     hotel_id: Optional[int] = None
     room_id: Optional[int] = None
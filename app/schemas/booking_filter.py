@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional
+from datetime import date
+
+class BookingFilter(BaseModel):
+    # Período
+    scope: Literal["all", "upcoming", "past"] = Field(
+        "all",
+        description="upcoming: check_in a partir de hoje (mais próximas primeiro); past: check_in antes de hoje; all: todas (mais recentes primeiro)"
+    )
+    check_in_from: Optional[date] = Field(None, description="check_in mínimo (inclusivo)")
+    check_in_to: Optional[date] = Field(None, description="check_in máximo (inclusivo)")
+
+    # Paginação
+    size: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = Field(None, description="Cursor opaco (meta.next_cursor) da página anterior")
+
+    @model_validator(mode="after")
+    def validate_range(self):
+        if self.check_in_from and self.check_in_to and self.check_in_from > self.check_in_to:
+            raise ValueError("check_in_from must be on or before check_in_to")
+        return self
@@ -1,10 +1,10 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import date
 
 class HotelFilter(BaseModel):
     # Filtros básicos
-    q: Optional[str] = Field(None, description="Busca textual pelo nome do hotel")
+    q: Optional[str] = Field(None, description="Busca textual pelo nome do hotel (ignora acentos e maiúsculas)")
     city: Optional[str] = None
     neighborhood: Optional[str] = None
     amenities: Optional[List[int]] = None
@@ -19,11 +19,12 @@ class HotelFilter(BaseModel):
     check_out: Optional[date] = None
 
     # Ordenação
-    sort: Optional[str] = Field("id", description="Critério de ordenação: id, price, rating, popularity, distance")
+    sort: Optional[str] = Field("id", description="Critério de ordenação: id, price, rating, popularity, distance, relevance")
 
     # Filtros relacionados a distância
     user_lat: Optional[float] = None
     user_lng: Optional[float] = None
+    radius_km: Optional[float] = Field(None, gt=0, description="Raio máximo (km) a partir de user_lat/user_lng")
 
     # Filtros de estrelas
     stars_min: Optional[float] = Field(None, ge=0, le=5)
@@ -32,6 +33,11 @@ class HotelFilter(BaseModel):
     # Paginação
     page: int = Field(1, ge=1)
     size: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = Field(None, description="Cursor opaco (meta.next_cursor) da página anterior; quando informado, page é ignorado")
+    count: Literal["exact", "estimate"] = Field(
+        "exact",
+        description="Cálculo de meta.total: exact (COUNT) ou estimate (estatísticas do planner, para resultados muito grandes)"
+    )
 
     # ----------------- FIELD VALIDATORS -----------------
     @field_validator("user_lat")
@@ -51,7 +57,7 @@ class HotelFilter(BaseModel):
     @field_validator("sort")
     @classmethod
     def allowed_sort(cls, v):
-        allowed = {"id", "price", "rating", "popularity", "distance"}
+        allowed = {"id", "price", "rating", "popularity", "distance", "relevance"}
         if v not in allowed:
             raise ValueError(f"sort must be one of: {', '.join(allowed)}")
         return v
@@ -1,5 +1,6 @@
-
-from typing import Generic, TypeVar, List
+import base64
+import json
+from typing import Any, Generic, TypeVar, List, Optional
 from pydantic import BaseModel
 
 T = TypeVar("T")
@@ -8,8 +9,32 @@ class PageMeta(BaseModel):
     page: int
     size: int
     total: int
+    total_estimated: bool = False  # True quando total vem das estatísticas do planner
+    next_cursor: Optional[str] = None  # cursor opaco da próxima página (None na última)
 
 class Page(BaseModel, Generic[T]):
     meta: PageMeta
     items: List[T]
 
+
+# -------------------- CURSOR --------------------
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    """
+    Serializa o payload do cursor (JSON) em base64 url-safe, opaco para o cliente.
+    """
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """
+    Inverso de encode_cursor. Lança ValueError se o cursor não for válido.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
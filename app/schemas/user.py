@@ -1,10 +1,12 @@
 from pydantic import BaseModel, Field
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
-from pydantic import field_validator
+from pydantic import field_validator, ValidationInfo
 import uuid
 import re
 
+BCRYPT_HASH = re.compile(r"^\$2[abxy]\$\d{2}\$[./A-Za-z0-9]{53}$")
+
 
 class User(BaseModel):
     id: str = Field(
@@ -70,7 +72,10 @@ class User(BaseModel):
     )
 
     @field_validator("password")
-    def validate_password(cls, v):
+    def validate_password(cls, v, info: ValidationInfo):
+        if info.context and info.context.get("stored_password") and BCRYPT_HASH.match(v):
+            # Hash lido do banco (model_validate de registro ORM com context); nunca vale para entrada do cliente
+            return v
         pattern = re.compile(
             r"^(?=.*[A-Za-z])(?=.*\d)(?=.*[@$!%*#?&])[A-Za-z\d@$!%*#?&]{8,}$"
         )
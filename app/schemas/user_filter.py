@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class UserFilter(BaseModel):
+    # Filtros
+    role: Optional[str] = Field(None, description="Papel exato (ex.: customer, sysAdmin)")
+    name_prefix: Optional[str] = Field(None, min_length=1, max_length=15, description="Início do userName (diferencia maiúsculas)")
+
+    # Paginação
+    size: int = Field(50, ge=1, le=200)
+    cursor: Optional[str] = Field(None, description="Cursor opaco (meta.next_cursor) da página anterior")
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.repositories.amenity_repository import AmenityRepository
+from app.services.search_cache import search_cache
 
 class AmenityService:
     def __init__(self, db: Session):
@@ -24,5 +25,8 @@ class AmenityService:
 
     def delete(self, amenity_id: int):
         amenity = self.get(amenity_id)
-        return self.repo.delete(amenity)
+        deleted = self.repo.delete(amenity)
+        # Remover uma amenity altera o filtro de amenities de qualquer busca
+        search_cache.invalidate_all()
+        return deleted
 
@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import uuid4
 from dotenv import load_dotenv
 import os
+import logging
 import jwt
 from jwt import PyJWTError
 from fastapi import Depends, HTTPException, status, Cookie, Request
@@ -8,10 +11,17 @@ from jwt.exceptions import InvalidTokenError
 from ..schemas.token import TokenData, Token
 from ..schemas.login import Login
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from app.database.database import get_db
 from ..services.user_service import UserDatabaseService
+from ..repositories.user_repository import UserRepository
+from ..services.principal_cache import principal_cache
+from ..services.revocation_store import revocation_store
+from ..services.password_hasher import password_hasher
 
 
+logger = logging.getLogger("aluga-api")
+
 load_dotenv()
 ACCESS_TOKEN_SECRET = os.getenv("ACCESS_TOKEN_SECRET")
 REFRESH_TOKEN_SECRET = os.getenv("REFRESH_TOKEN_SECRET")
@@ -19,26 +29,57 @@ ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES"))
 
-async def get_current_user(request: Request):
-    
+async def get_current_user(request: Request) -> TokenData:
+    """
+    Principal (id, role, userName) do token de acesso. Tokens já vistos vêm do principal_cache,
+    sem decodificar o JWT nem consultar o banco; invalidado quando o usuário muda em /users.
+    Na falta do cache, a verificação do JWT e a consulta (síncronas) rodam no threadpool,
+    sem bloquear o event loop. Tokens revogados (logout) são recusados pelo jti, consultando
+    só a memória do revocation_store.
+    """
     access_token = handle_auth_method(request, "access_token");
-    print(access_token)
     credentials_exception = HTTPException(status_code= 401,
                                           detail="Could not Validate Credentials",
                                           headers={"WWW-Authenticate": "Bearer"})
     
     if not access_token:
       raise credentials_exception
+
+    cached = principal_cache.get(access_token)
+    if cached:
+        principal, jti = cached
+        if revocation_store.is_revoked(jti):
+            raise credentials_exception
+        return principal
+
+    return await run_in_threadpool(load_principal, access_token, credentials_exception)
+
+async def get_optional_user(request: Request) -> Optional[TokenData]:
+    """
+    Principal quando a requisição traz um token válido; None em rotas abertas sem autenticação.
+    """
+    try:
+        return await get_current_user(request)
+    except HTTPException:
+        return None
+
+def load_principal(access_token: str, credentials_exception: HTTPException) -> TokenData:
     access_token_data = verify_token_access(access_token, credentials_exception)
+    if revocation_store.is_revoked(access_token_data.get("jti")):
+        raise credentials_exception
     db_gen = get_db()
-    db = next(db_gen)   
-    user_data = UserDatabaseService(db).get_by_id(access_token_data["id"])
-    db_gen.close()
+    db = next(db_gen)
+    try:
+        user_data = UserRepository(db).get_principal(access_token_data["id"])
+    finally:
+        db_gen.close()
     if not user_data:
         raise credentials_exception
-    
-    #must query db
-    return user_data
+
+    principal = TokenData(id=user_data.id, role=user_data.role, userName=user_data.userName)
+    principal_cache.set(access_token, principal,
+                        token_exp=access_token_data.get("exp"), jti=access_token_data.get("jti"))
+    return principal
 
 def check_admin_role(current_user = Depends(get_current_user)):
     if current_user.role != "sysAdmin":
@@ -46,18 +87,25 @@ def check_admin_role(current_user = Depends(get_current_user)):
     return current_user 
 
 def authenticate_user(login: Login):
-  # passwords are still to be hashed
+  # bcrypt roda no pool do password_hasher; senhas legadas em texto puro são migradas para hash no login
   db_gen = get_db()
   db = next(db_gen)
-  
-  fetchedUser = UserDatabaseService(db).get_by_username(login.userName)
-  if not fetchedUser:
-    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
-  db_gen.close()
-
-  if(login.userName == fetchedUser.userName and login.password == fetchedUser.password):
-     return fetchedUser
-  raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
+  try:
+    fetchedUser = UserDatabaseService(db).get_by_username(login.userName)
+    if not fetchedUser:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
+
+    valid, new_hash = password_hasher.verify_and_upgrade(login.password, fetchedUser.password)
+    if not valid:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
+    if new_hash:
+      fetchedUser.password = new_hash
+      db.commit()
+      db.refresh(fetchedUser)
+      logger.info("password hash upgraded", extra={"user_id": fetchedUser.id})
+    return fetchedUser
+  finally:
+    db_gen.close()
 
 def get_credentials(request):
     access_token = handle_auth_method(request, "access_token");
@@ -119,13 +167,20 @@ def perform_logout(request: Request, current_user = Depends(get_current_user)):
         path="/"
         )
 
-  # For headers
-  print("HEADERS: ")
-  print(request.headers.keys())
-  print("COOKIES: ")
-  print(request.cookies.keys())
-    # Invalidate access and refresh token
-    # Needs db working
+  # Revoga os jtis dos tokens apresentados; tokens ausentes, inválidos ou já expirados são ignorados
+  for key, secret in (("access_token", ACCESS_TOKEN_SECRET), ("refresh_token", REFRESH_TOKEN_SECRET)):
+    token = request.headers.get(key) or request.cookies.get(key)
+    if not token:
+      continue
+    try:
+      payload = jwt.decode(token, secret, algorithms=[ALGORITHM])
+    except (PyJWTError, InvalidTokenError):
+      continue
+    revocation_store.revoke(payload.get("jti"), datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None))
+    if key == "access_token":
+      principal_cache.invalidate_token(token)
+
+  logger.info("logout")
   return response
 
 def perform_refresh(request: Request):
@@ -135,6 +190,8 @@ def perform_refresh(request: Request):
       user: str = payload
       if user["id"] is None:
         raise HTTPException(status_code=404, detail="User not found")
+      if revocation_store.is_revoked(user.get("jti")):
+        raise InvalidTokenError("revoked")
     except (PyJWTError, InvalidTokenError):
       raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="Unauthorized access, please authenticate.")
@@ -166,8 +223,7 @@ def perform_refresh(request: Request):
 def create_access_token(data: TokenData):
     to_encode = data.model_dump()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})  # this will be properly interpreted by JWT
-    print(to_encode["exp"])
+    to_encode.update({"exp": expire, "jti": uuid4().hex})  # this will be properly interpreted by JWT
     encoded_jwt = jwt.encode(to_encode, ACCESS_TOKEN_SECRET, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -175,31 +231,23 @@ def verify_token_access(token: str, credentials_exception):
     try:
         payload = jwt.decode(token, ACCESS_TOKEN_SECRET, algorithms=[ALGORITHM])
         token_data = payload
-    except (PyJWTError, InvalidTokenError) as e:
-        print(token)
-        print("Token error:", e)
+    except (PyJWTError, InvalidTokenError):
         raise credentials_exception
     return token_data
 
 def create_refresh_token(data: TokenData):
     to_encode = data.model_dump()
-    print("create_refresh_token", to_encode)
     expire = datetime.now(timezone.utc) + timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, REFRESH_TOKEN_SECRET, algorithm=ALGORITHM)
-    print("create_refresh_token encoded_jwt", encoded_jwt)
     return encoded_jwt
 
 def handle_auth_method(request: Request, key: str):
-  print(request.cookies)
-  print(request.headers)
   keyValue: str = None;
   if request.headers.get(key) != None:
       keyValue = request.headers.get(key)
-      print("header token auth")
   elif request.cookies.get(key) != None:
       keyValue = request.cookies.get(key)
-      print("cookie auth", keyValue)
   if not keyValue:
       raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                       detail="No authentication data found, please authenticate")
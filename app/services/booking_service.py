@@ -0,0 +1,490 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, lazyload, load_only, selectinload
+
+from app.models.booking import Booking
+from app.models.booking_hold import BookingHold
+from app.models.hotel import Hotel
+from app.models.room import Room
+from app.repositories.inventory_repository import InventoryRepository
+from app.repositories.hotel_metrics_repository import HotelMetricsRepository
+from app.schemas.booking import BookingCreate, BookingUpdate, BookingWithDetails, HotelNested, RoomNested
+from app.schemas.booking_filter import BookingFilter
+from app.schemas.pagination import Page, PageMeta, encode_cursor, decode_cursor
+from app.schemas.user import User
+from app.services.metrics_worker import metrics_worker
+from app.services.search_cache import search_cache
+from app.settings import BookingHoldSettings
+
+
+class BookingService:
+    """
+    Escritas de reserva sem idas e voltas extras: quarto e hotel vêm de uma única projeção,
+    que também monta a resposta (sem refresh nem nova consulta com joins após o commit).
+    """
+    def __init__(self, db: Session):
+        self.db = db
+        self.inventory = InventoryRepository(db)
+        self.metrics_repo = HotelMetricsRepository(db)
+
+    # ------------------- CREATE -------------------
+    def create_booking(self, booking_data: BookingCreate, current_user: User) -> BookingWithDetails:
+        self._validate_dates(booking_data.check_in, booking_data.check_out)
+
+        # Quarto + hotel em uma consulta (404 / quarto de outro hotel = 422)
+        room = self._load_rooms([booking_data.room_id]).get(booking_data.room_id)
+        self._validate_room(room, booking_data.room_id, booking_data.hotel_id, ["body"])
+
+        new_booking = Booking(
+            user_id=current_user.id,
+            hotel_id=booking_data.hotel_id,
+            room_id=booking_data.room_id,
+            check_in=booking_data.check_in,
+            check_out=booking_data.check_out,
+            rooms_booked=booking_data.rooms_booked or 1,
+        )
+
+        # Reserva o inventário na mesma transação (409 se alguma noite estiver lotada)
+        try:
+            self.inventory.reserve(
+                new_booking.room_id, new_booking.check_in, new_booking.check_out,
+                new_booking.rooms_booked, room.total_units
+            )
+            self.db.add(new_booking)
+            self.db.flush()
+            self.metrics_repo.add_booking(new_booking.hotel_id, new_booking.created_at.date(), 1)
+            # Monta a resposta antes do commit (que expira os atributos)
+            details = self._to_details(new_booking, room)
+            self.db.commit()
+        except HTTPException:
+            self.db.rollback()
+            raise
+
+        # Disponibilidade e preço do hotel mudaram: invalida buscas em cache
+        search_cache.invalidate_hotel(room.hotel_id, room.hotel_city)
+
+        # Agenda o recálculo da popularidade (em segundo plano)
+        metrics_worker.schedule(room.hotel_id)
+
+        return details
+
+    # ------------------- HISTÓRICO -------------------
+    def list_bookings(self, filters: BookingFilter, current_user: User) -> Page[BookingWithDetails]:
+        """
+        Histórico paginado por cursor (keyset em check_in, id), servido pelo índice (user_id, check_in).
+        """
+        descending = filters.scope != "upcoming"
+        conditions = [Booking.user_id == current_user.id]
+
+        today = date.today()
+        if filters.scope == "upcoming":
+            conditions.append(Booking.check_in >= today)
+        elif filters.scope == "past":
+            conditions.append(Booking.check_in < today)
+        if filters.check_in_from:
+            conditions.append(Booking.check_in >= filters.check_in_from)
+        if filters.check_in_to:
+            conditions.append(Booking.check_in <= filters.check_in_to)
+
+        total = self.db.query(func.count(Booking.id)).filter(*conditions).scalar()
+
+        query = self.db.query(Booking).filter(*conditions).options(*self._details_options())
+        if filters.cursor:
+            last_check_in, last_id = self._decode_history_cursor(filters)
+            position = tuple_(Booking.check_in, Booking.id)
+            query = query.filter(
+                position < (last_check_in, last_id) if descending else position > (last_check_in, last_id)
+            )
+        if descending:
+            query = query.order_by(Booking.check_in.desc(), Booking.id.desc())
+        else:
+            query = query.order_by(Booking.check_in.asc(), Booking.id.asc())
+
+        # Busca um registro a mais para saber se existe próxima página
+        bookings = query.limit(filters.size + 1).all()
+        has_next = len(bookings) > filters.size
+        bookings = bookings[:filters.size]
+
+        next_cursor = None
+        if has_next:
+            last = bookings[-1]
+            next_cursor = encode_cursor({
+                "scope": filters.scope,
+                "keys": [last.check_in.isoformat(), last.id]
+            })
+
+        return Page[BookingWithDetails](
+            meta=PageMeta(page=1, size=filters.size, total=total, next_cursor=next_cursor),
+            items=[BookingWithDetails.model_validate(booking) for booking in bookings]
+        )
+
+    # ------------------- CREATE EM LOTE -------------------
+    def create_bookings_bulk(self, items: List[BookingCreate], current_user: User) -> List[BookingWithDetails]:
+        """
+        Cria várias reservas numa única transação (tudo ou nada). Quartos e hotéis são validados
+        com uma só consulta e as métricas são agendadas uma vez por hotel afetado.
+        """
+        rooms = self._load_rooms(item.room_id for item in items)
+
+        errors = []
+        for i, item in enumerate(items):
+            loc = ["body", "bookings", i]
+            date_error = self._date_error(item.check_in, item.check_out, loc + ["check_out"])
+            if date_error:
+                errors.append(date_error)
+            room_error = self._room_error(rooms.get(item.room_id), item.room_id, item.hotel_id, loc)
+            if room_error:
+                errors.append(room_error)
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+
+        new_bookings = [
+            Booking(
+                user_id=current_user.id,
+                hotel_id=item.hotel_id,
+                room_id=item.room_id,
+                check_in=item.check_in,
+                check_out=item.check_out,
+                rooms_booked=item.rooms_booked or 1,
+            )
+            for item in items
+        ]
+
+        try:
+            # Ordem fixa de quarto/noite: lotes concorrentes travam as linhas na mesma sequência
+            for booking in sorted(new_bookings, key=lambda b: (b.room_id, b.check_in)):
+                self.inventory.reserve(
+                    booking.room_id, booking.check_in, booking.check_out,
+                    booking.rooms_booked, rooms[booking.room_id].total_units
+                )
+            self.db.add_all(new_bookings)
+            self.db.flush()
+
+            per_day = Counter((b.hotel_id, b.created_at.date()) for b in new_bookings)
+            for (hotel_id, day), count in sorted(per_day.items()):
+                self.metrics_repo.add_booking(hotel_id, day, count)
+
+            # Resposta na ordem do pedido, a partir das linhas já carregadas
+            details = [self._to_details(b, rooms[b.room_id]) for b in new_bookings]
+            self.db.commit()
+        except HTTPException:
+            self.db.rollback()
+            raise
+
+        hotel_cities = {room.hotel_id: room.hotel_city for room in rooms.values()}
+        for hotel_id, city in hotel_cities.items():
+            search_cache.invalidate_hotel(hotel_id, city)
+            metrics_worker.schedule(hotel_id)
+
+        return details
+
+    # ------------------- UPDATE -------------------
+    def update_booking(self, booking_id: int, booking_update: BookingUpdate, current_user: User) -> BookingWithDetails:
+        booking = (
+            self.db.query(Booking)
+            .filter(Booking.id == booking_id, Booking.user_id == current_user.id)
+            .first()
+        )
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        previous_stay = (booking.room_id, booking.check_in, booking.check_out, booking.rooms_booked)
+        previous_hotel_id = booking.hotel_id
+
+        # Atualiza datas
+        if booking_update.check_in is not None:
+            booking.check_in = booking_update.check_in
+        if booking_update.check_out is not None:
+            booking.check_out = booking_update.check_out
+        self._validate_dates(booking.check_in, booking.check_out)
+
+        # Quarto/hotel de destino em uma consulta; ela também alimenta a resposta
+        room_id = booking_update.room_id if booking_update.room_id is not None else booking.room_id
+        hotel_id = booking_update.hotel_id if booking_update.hotel_id is not None else booking.hotel_id
+        room = self._load_rooms([room_id]).get(room_id)
+        if booking_update.room_id is not None or booking_update.hotel_id is not None:
+            self._validate_room(room, room_id, hotel_id, ["body"])
+        booking.room_id = room_id
+        booking.hotel_id = hotel_id
+
+        # Atualiza quantidade de quartos
+        if booking_update.rooms_booked is not None:
+            booking.rooms_booked = booking_update.rooms_booked
+
+        # Move o inventário da estadia anterior para a nova, na mesma transação
+        current_stay = (booking.room_id, booking.check_in, booking.check_out, booking.rooms_booked)
+        hotel_changed = hotel_id != previous_hotel_id
+        try:
+            if current_stay != previous_stay:
+                self.inventory.release(*previous_stay)
+                self.inventory.reserve(*current_stay, room.total_units)
+            if hotel_changed:
+                created_day = booking.created_at.date()
+                self.metrics_repo.add_booking(previous_hotel_id, created_day, -1)
+                self.metrics_repo.add_booking(hotel_id, created_day, 1)
+            details = self._to_details(booking, room)
+            self.db.commit()
+        except HTTPException:
+            self.db.rollback()
+            raise
+
+        if current_stay != previous_stay or hotel_changed:
+            search_cache.invalidate_hotel(hotel_id, room.hotel_city)
+        if hotel_changed:
+            self._invalidate_search_cache(previous_hotel_id)
+            metrics_worker.schedule(previous_hotel_id)
+            metrics_worker.schedule(hotel_id)
+
+        return details
+
+    # ------------------- DELETE -------------------
+    def delete_booking(self, booking_id: int, current_user: User) -> None:
+        booking = (
+            self.db.query(Booking)
+            .filter(Booking.id == booking_id, Booking.user_id == current_user.id)
+            .first()
+        )
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        hotel_id = booking.hotel_id
+
+        self.inventory.release(booking.room_id, booking.check_in, booking.check_out, booking.rooms_booked)
+        self.metrics_repo.add_booking(hotel_id, booking.created_at.date(), -1)
+
+        self.db.delete(booking)
+        self.db.commit()
+
+        self._invalidate_search_cache(hotel_id)
+
+        # Agenda o recálculo da popularidade (em segundo plano)
+        metrics_worker.schedule(hotel_id)
+
+    # ------------------- HOLDS -------------------
+    def create_hold(self, hold_data: BookingCreate, current_user: User) -> BookingHold:
+        """
+        Bloqueia o inventário por BookingHoldSettings.TTL_SECONDS enquanto o usuário paga.
+        Conta na disponibilidade (room_nights) como uma reserva, mas não mexe nas métricas.
+        """
+        self._validate_dates(hold_data.check_in, hold_data.check_out)
+        room = self._load_rooms([hold_data.room_id]).get(hold_data.room_id)
+        self._validate_room(room, hold_data.room_id, hold_data.hotel_id, ["body"])
+
+        hold = BookingHold(
+            user_id=current_user.id,
+            hotel_id=hold_data.hotel_id,
+            room_id=hold_data.room_id,
+            check_in=hold_data.check_in,
+            check_out=hold_data.check_out,
+            rooms_booked=hold_data.rooms_booked or 1,
+            expires_at=datetime.utcnow() + timedelta(seconds=BookingHoldSettings.TTL_SECONDS),
+        )
+        try:
+            self.inventory.reserve(
+                hold.room_id, hold.check_in, hold.check_out, hold.rooms_booked, room.total_units
+            )
+            self.db.add(hold)
+            self.db.commit()
+        except HTTPException:
+            self.db.rollback()
+            raise
+        self.db.refresh(hold)
+
+        search_cache.invalidate_hotel(room.hotel_id, room.hotel_city)
+        return hold
+
+    def confirm_hold(self, hold_id: int, current_user: User) -> BookingWithDetails:
+        """
+        Converte o hold em reserva. As noites já estão ocupadas: o inventário não é tocado de novo.
+        """
+        hold = self._get_user_hold(hold_id, current_user, for_update=True)
+        if hold.expires_at <= datetime.utcnow():
+            hotel_id = hold.hotel_id
+            self._release_holds([hold])
+            self.db.commit()
+            self._invalidate_search_cache(hotel_id)
+            raise HTTPException(status_code=409, detail=f"Hold {hold_id} expirou; o inventário foi liberado")
+
+        room = self._load_rooms([hold.room_id])[hold.room_id]
+        booking = Booking(
+            user_id=hold.user_id,
+            hotel_id=hold.hotel_id,
+            room_id=hold.room_id,
+            check_in=hold.check_in,
+            check_out=hold.check_out,
+            rooms_booked=hold.rooms_booked,
+        )
+        self.db.add(booking)
+        self.db.delete(hold)
+        self.db.flush()
+        self.metrics_repo.add_booking(booking.hotel_id, booking.created_at.date(), 1)
+        details = self._to_details(booking, room)
+        self.db.commit()
+
+        metrics_worker.schedule(room.hotel_id)
+        return details
+
+    def release_hold(self, hold_id: int, current_user: User) -> None:
+        hold = self._get_user_hold(hold_id, current_user, for_update=True)
+        hotel_id = hold.hotel_id
+        self._release_holds([hold])
+        self.db.commit()
+        self._invalidate_search_cache(hotel_id)
+
+    def release_expired_holds(self, limit: int) -> int:
+        """
+        Libera até `limit` holds expirados em uma transação. SKIP LOCKED evita disputar com
+        confirmações em andamento ou com outro sweeper. Retorna quantos foram liberados.
+        """
+        holds = (
+            self.db.query(BookingHold)
+            .filter(BookingHold.expires_at < datetime.utcnow())
+            .order_by(BookingHold.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not holds:
+            return 0
+
+        hotel_ids = {hold.hotel_id for hold in holds}
+        self._release_holds(holds)
+        self.db.commit()
+
+        for hotel_id, city in self.db.query(Hotel.id, Hotel.city).filter(Hotel.id.in_(hotel_ids)):
+            search_cache.invalidate_hotel(hotel_id, city)
+        return len(holds)
+
+    def _get_user_hold(self, hold_id: int, current_user: User, for_update: bool = False) -> BookingHold:
+        query = self.db.query(BookingHold).filter(
+            BookingHold.id == hold_id, BookingHold.user_id == current_user.id
+        )
+        if for_update:
+            query = query.with_for_update()
+        hold = query.first()
+        if not hold:
+            raise HTTPException(status_code=404, detail="Hold not found")
+        return hold
+
+    def _release_holds(self, holds: List[BookingHold]) -> None:
+        # Mesma ordem de quarto/noite das reservas, para não inverter a ordem dos locks
+        for hold in sorted(holds, key=lambda h: (h.room_id, h.check_in)):
+            self.inventory.release(hold.room_id, hold.check_in, hold.check_out, hold.rooms_booked)
+        self.db.execute(delete(BookingHold).where(BookingHold.id.in_([hold.id for hold in holds])))
+
+    # ------------------- PRIVADOS -------------------
+    def _load_rooms(self, room_ids: Iterable[int]) -> Dict[int, Row]:
+        """
+        Quartos com os dados do hotel em uma única projeção: validação, inventário e resposta.
+        """
+        rows = (
+            self.db.query(
+                Room.id, Room.name, Room.room_type, Room.base_price, Room.total_units, Room.hotel_id,
+                Hotel.name.label("hotel_name"), Hotel.city.label("hotel_city"), Hotel.stars.label("hotel_stars")
+            )
+            .join(Hotel, Hotel.id == Room.hotel_id)
+            .filter(Room.id.in_(set(room_ids)))
+        )
+        return {row.id: row for row in rows}
+
+    @classmethod
+    def _validate_room(cls, room: Optional[Row], room_id: int, hotel_id: int, loc: list) -> None:
+        error = cls._room_error(room, room_id, hotel_id, loc)
+        if error and error["type"] == "not_found":
+            raise HTTPException(status_code=404, detail=error["msg"])
+        if error:
+            raise HTTPException(status_code=422, detail=[error])
+
+    @staticmethod
+    def _room_error(room: Optional[Row], room_id: int, hotel_id: int, loc: list) -> Optional[dict]:
+        if not room:
+            return {
+                "loc": loc + ["room_id"],
+                "msg": f"Quarto {room_id} não encontrado",
+                "type": "not_found",
+                "input": room_id
+            }
+        if room.hotel_id != hotel_id:
+            return {
+                "loc": loc + ["hotel_id"],
+                "msg": f"Quarto {room_id} não pertence ao hotel {hotel_id}",
+                "type": "value_error",
+                "input": hotel_id
+            }
+        return None
+
+    @staticmethod
+    def _to_details(booking: Booking, room: Row) -> BookingWithDetails:
+        return BookingWithDetails(
+            id=booking.id,
+            user_id=booking.user_id,
+            hotel_id=booking.hotel_id,
+            room_id=booking.room_id,
+            check_in=booking.check_in,
+            check_out=booking.check_out,
+            rooms_booked=booking.rooms_booked,
+            hotel=HotelNested(id=room.hotel_id, name=room.hotel_name, city=room.hotel_city, stars=room.hotel_stars),
+            room=RoomNested(id=room.id, name=room.name, room_type=room.room_type, base_price=room.base_price),
+        )
+
+    @staticmethod
+    def _details_options() -> list:
+        """
+        Hotel e quarto de uma página inteira em uma consulta (IN) cada, só com as colunas do
+        BookingWithDetails. lazyload("*") evita os selectin de Hotel/Room (quartos, reviews, reservas...).
+        """
+        return [
+            selectinload(Booking.hotel).options(
+                load_only(Hotel.id, Hotel.name, Hotel.city, Hotel.stars),
+                lazyload("*")
+            ),
+            selectinload(Booking.room).options(
+                load_only(Room.id, Room.name, Room.room_type, Room.base_price),
+                lazyload("*")
+            ),
+        ]
+
+    @staticmethod
+    def _decode_history_cursor(filters: BookingFilter) -> Tuple[date, int]:
+        try:
+            payload = decode_cursor(filters.cursor)
+            if payload.get("scope") != filters.scope:
+                raise ValueError("cursor does not match the requested scope")
+            check_in, booking_id = payload["keys"]
+            return date.fromisoformat(check_in), int(booking_id)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise HTTPException(
+                status_code=422,
+                detail=[{
+                    "loc": ["query", "cursor"],
+                    "msg": "Invalid cursor for this listing. Start again without cursor.",
+                    "type": "value_error.cursor",
+                    "input": filters.cursor
+                }]
+            )
+
+    def _invalidate_search_cache(self, hotel_id: int) -> None:
+        city = self.db.query(Hotel.city).filter(Hotel.id == hotel_id).scalar()
+        search_cache.invalidate_hotel(hotel_id, city)
+
+    @classmethod
+    def _validate_dates(cls, check_in: date, check_out: date) -> None:
+        error = cls._date_error(check_in, check_out, ["body", "check_out"])
+        if error:
+            raise HTTPException(status_code=422, detail=[error])
+
+    @staticmethod
+    def _date_error(check_in: date, check_out: date, loc: list) -> Optional[dict]:
+        if check_out > check_in:
+            return None
+        return {
+            "loc": loc,
+            "msg": "check_out must be after check_in",
+            "type": "value_error",
+            "input": {"check_in": check_in.isoformat(), "check_out": check_out.isoformat()}
+        }
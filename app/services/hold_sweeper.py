@@ -0,0 +1,70 @@
+# hold_sweeper.py
+import logging
+import threading
+from typing import Optional
+
+from app.database.database import SessionLocal
+from app.services.booking_service import BookingService
+from app.settings import BookingHoldSettings
+
+logger = logging.getLogger("aluga-api")
+
+
+class HoldSweeper:
+    """
+    Libera periodicamente os holds de checkout expirados, em lotes de batch_size por transação.
+    """
+    def __init__(self, interval_seconds: float, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.released = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hold-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {"released": self.released, "failures": self.failures}
+
+    def sweep(self) -> int:
+        """
+        Libera todos os holds expirados no momento, lote a lote. Retorna o total liberado.
+        """
+        total = 0
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                released = BookingService(db).release_expired_holds(self.batch_size)
+            except Exception as e:
+                db.rollback()
+                self.failures += 1
+                logger.error(f"Falha ao liberar holds expirados: {e}")
+                break
+            finally:
+                db.close()
+            total += released
+            self.released += released
+            if released < self.batch_size:
+                break
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.sweep()
+
+
+hold_sweeper = HoldSweeper(
+    interval_seconds=BookingHoldSettings.SWEEP_INTERVAL_SECONDS,
+    batch_size=BookingHoldSettings.SWEEP_BATCH_SIZE,
+)
@@ -1,40 +1,42 @@
 # hotel_metrics_service.py
 import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+import time
+from sqlalchemy import Numeric, and_, case, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
 
-from app.models.review import Review
+from app.models.booking import Booking
 from app.models.hotel import Hotel
-from app.models.booking import Booking 
+from app.models.hotel_booking_day import HotelBookingDay
+from app.models.review import Review
+from app.repositories.hotel_metrics_repository import HotelMetricsRepository
+from app.services.search_cache import search_cache
+from app.settings import HotelSettings
 
 class HotelMetricsService:
     def __init__(self, db: Session):
         self.db = db
+        self.repo = HotelMetricsRepository(db)
 
     def calculate_and_update_metrics(self, hotel_id: int):
         
-        # Calcular STARS (MÉTRICA DE QUALIDADE)
-        avg_rating_result = self.db.query(func.avg(Review.rating)).filter(
-            Review.hotel_id == hotel_id
-        ).scalar()
+        # Projeção de colunas: carregar o Hotel dispararia os selectin de reviews/bookings
+        counters = self.db.query(Hotel.rating_sum, Hotel.review_count, Hotel.city).filter(
+            Hotel.id == hotel_id
+        ).first()
+        if not counters:
+            return True
+
+        # Calcular STARS (MÉTRICA DE QUALIDADE) a partir dos agregados incrementais
+        total_reviews = counters.review_count
         
         calculated_stars = 0.0
-        if avg_rating_result is not None and avg_rating_result > 0:
-            calculated_stars = round(avg_rating_result, 1)
+        if total_reviews > 0 and counters.rating_sum > 0:
+            calculated_stars = round(counters.rating_sum / total_reviews, 1)
             
         # Calcular POPULARIDADE (MÉTRICA DE ENGAGEMENT)
         
-        thirty_days_ago = datetime.date.today() - datetime.timedelta(days=30)
-        try:
-            bookings_count = self.db.query(Booking).filter(
-                and_(Booking.hotel_id == hotel_id, Booking.created_at >= thirty_days_ago)
-            ).count()
-        except Exception:
-            bookings_count = 0 
-        
-        total_reviews = self.db.query(Review).filter(
-            Review.hotel_id == hotel_id
-        ).count() 
+        window_start = self._window_start()
+        bookings_count = self.repo.bookings_since(hotel_id, window_start)
         
         stars_score = calculated_stars 
         
@@ -47,13 +49,138 @@ class HotelMetricsService:
         )
         
         # Atualizar o Hotel
-        hotel_to_update = self.db.query(Hotel).filter(Hotel.id == hotel_id).first()
-        
-        if hotel_to_update:
-            # Nota de arquitetura: em ambiente produtivo o ideal seria essa atualização ocorrer via job/batch para não onerar nenhum serviço.
-            
-            hotel_to_update.stars = calculated_stars
-            hotel_to_update.popularity = popularity_score
-            self.db.commit()
+        self.db.execute(
+            update(Hotel)
+            .where(Hotel.id == hotel_id)
+            .values(stars=calculated_stars, popularity=popularity_score)
+        )
+        self.db.commit()
+
+        # stars/popularity entram em filtros e ordenação da busca
+        search_cache.invalidate_hotel(hotel_id, counters.city)
+
+        return True
+
+    # -------------------- BATCH --------------------
+    def recalculate_all(self, rebuild_counters: bool = False) -> dict:
+        """
+        Recalcula stars/popularidade de todo o catálogo com UPDATE ... FROM (sem laço por hotel).
+        Só os buckets de reserva dentro da janela entram na soma, então reservas antigas deixam de
+        contar mesmo em hotéis sem escritas recentes; os buckets antigos são mantidos (histórico
+        para mudanças de janela). Com rebuild_counters, os agregados incrementais são reconstruídos
+        a partir de reviews e bookings antes do recálculo.
+        Retorna, por etapa, linhas afetadas, segundos e linhas/segundo.
+        """
+        report = {}
+        window_start = self._window_start()
+
+        if rebuild_counters:
+            report["review_counters"] = self._timed(self._rebuild_review_counters)
+            report["booking_days"] = self._timed(self._rebuild_booking_days)
+
+        report["hotels"] = self._timed(lambda: self._update_all_hotels(window_start))
+        self.db.commit()
+
+        search_cache.invalidate_all()
+        return report
+
+    def _update_all_hotels(self, window_start: datetime.date) -> int:
+        recent = (
+            select(
+                HotelBookingDay.hotel_id,
+                func.sum(HotelBookingDay.bookings).label("bookings")
+            )
+            .where(HotelBookingDay.day >= window_start)
+            .group_by(HotelBookingDay.hotel_id)
+            .subquery()
+        )
+
+        # Alias para não correlacionar com a tabela do UPDATE
+        hotel = aliased(Hotel)
+        stars_expr = case(
+            (
+                and_(hotel.review_count > 0, hotel.rating_sum > 0),
+                func.round(cast(hotel.rating_sum / hotel.review_count, Numeric), 1)
+            ),
+            else_=0
+        )
+        metrics = (
+            select(
+                hotel.id.label("hotel_id"),
+                stars_expr.label("stars"),
+                func.coalesce(recent.c.bookings, 0).label("bookings")
+            )
+            .outerjoin(recent, recent.c.hotel_id == hotel.id)
+            .subquery()
+        )
+
+        # Mesma fórmula de calculate_and_update_metrics
+        popularity_expr = func.round(
+            cast(
+                0.5 * metrics.c.bookings
+                + 0.3 * Hotel.review_count
+                + 0.2 * metrics.c.stars,
+                Numeric
+            ),
+            1
+        )
+        return self.db.execute(
+            update(Hotel)
+            .where(Hotel.id == metrics.c.hotel_id)
+            .values(stars=metrics.c.stars, popularity=popularity_expr)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def _rebuild_review_counters(self) -> int:
+        totals = (
+            select(
+                Review.hotel_id,
+                func.sum(Review.rating).label("rating_sum"),
+                func.count(Review.id).label("review_count")
+            )
+            .group_by(Review.hotel_id)
+            .subquery()
+        )
+        hotel = aliased(Hotel)
+        counters = (
+            select(
+                hotel.id.label("hotel_id"),
+                func.coalesce(totals.c.rating_sum, 0).label("rating_sum"),
+                func.coalesce(totals.c.review_count, 0).label("review_count")
+            )
+            .outerjoin(totals, totals.c.hotel_id == hotel.id)
+            .subquery()
+        )
+        return self.db.execute(
+            update(Hotel)
+            .where(Hotel.id == counters.c.hotel_id)
+            .values(rating_sum=counters.c.rating_sum, review_count=counters.c.review_count)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def _rebuild_booking_days(self) -> int:
+        # Histórico completo: a janela é aplicada na leitura (bookings_since / _update_all_hotels)
+        self.db.execute(delete(HotelBookingDay))
+        created_day = cast(Booking.created_at, HotelBookingDay.day.type)
+        return self.db.execute(
+            insert(HotelBookingDay).from_select(
+                ["hotel_id", "day", "bookings"],
+                select(Booking.hotel_id, created_day, func.count(Booking.id))
+                .group_by(Booking.hotel_id, created_day)
+            )
+        ).rowcount
+
+    @staticmethod
+    def _window_start() -> datetime.date:
+        return datetime.date.today() - datetime.timedelta(days=HotelSettings.POPULARITY_WINDOW_DAYS)
 
-        return True
\ No newline at end of file
+    @staticmethod
+    def _timed(step) -> dict:
+        start = time.perf_counter()
+        rows = step()
+        seconds = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+        }
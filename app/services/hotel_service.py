@@ -1,18 +1,27 @@
+import csv
+import io
 from math import radians, cos, sin, atan2, sqrt
-from typing import List, Optional
+from datetime import date
+from typing import Iterator, List, Optional
 
 from fastapi import HTTPException
 
 from sqlalchemy.orm import Session
 
+from app.database.database import SessionLocal
 from app.models.hotel import Hotel
 from app.models.room import Room
 from app.models.media import Media
 from app.repositories.hotel_repository import HotelRepository
+from app.repositories.inventory_repository import InventoryRepository
 from app.schemas.hotel import HotelIn, HotelDetail, HotelCard
+from app.schemas.availability import HotelAvailability, RoomAvailability, NightAvailability
 from app.schemas.room import RoomIn
 from app.schemas.media import MediaIn
 from app.schemas.hotel_filter import HotelFilter
+from app.schemas.pagination import Page
+from app.services.search_cache import search_cache
+from app.settings import HotelSettings
 
 
 class HotelService:
@@ -51,7 +60,9 @@ class HotelService:
             longitude=hotel_in.longitude,
             policies=hotel_in.policies,
         )
-        return self.repo.create(self.db, hotel)
+        hotel = self.repo.create(self.db, hotel)
+        search_cache.invalidate_hotel(hotel.id, hotel.city)
+        return hotel
 
 
     # -------------------- GET --------------------
@@ -92,15 +103,75 @@ class HotelService:
 
 
 
+    # -------------------- DISPONIBILIDADE --------------------
+    def get_availability(self, hotel_id: int, check_in: date, check_out: date) -> HotelAvailability:
+        """
+        Matriz quarto x noite (unidades livres e preço) em [check_in, check_out), lida do calendário
+        room_nights em uma única consulta.
+        """
+        nights = InventoryRepository.nights(check_in, check_out)
+        if not nights or len(nights) > HotelSettings.AVAILABILITY_MAX_NIGHTS:
+            raise HTTPException(
+                status_code=422,
+                detail=[{
+                    "loc": ["query", "check_out"],
+                    "msg": f"check_out must be after check_in, up to {HotelSettings.AVAILABILITY_MAX_NIGHTS} nights",
+                    "type": "value_error",
+                    "input": {"check_in": check_in.isoformat(), "check_out": check_out.isoformat()}
+                }]
+            )
+
+        if not self.db.query(Hotel.id).filter(Hotel.id == hotel_id).scalar():
+            raise HTTPException(status_code=404, detail="Hotel not found")
+
+        rooms = (
+            self.db.query(Room.id, Room.name, Room.room_type, Room.total_units, Room.base_price)
+            .filter(Room.hotel_id == hotel_id)
+            .order_by(Room.id)
+            .all()
+        )
+        booked = InventoryRepository(self.db).booked_by_night([room.id for room in rooms], check_in, check_out)
+
+        return HotelAvailability(
+            hotel_id=hotel_id,
+            check_in=check_in,
+            check_out=check_out,
+            rooms=[
+                RoomAvailability(
+                    room_id=room.id,
+                    name=room.name,
+                    room_type=room.room_type,
+                    total_units=room.total_units,
+                    nights=[
+                        NightAvailability(
+                            night=night,
+                            units_left=max(room.total_units - booked.get((room.id, night), 0), 0),
+                            price=room.base_price
+                        )
+                        for night in nights
+                    ]
+                )
+                for room in rooms
+            ]
+        )
+
     def update_hotel(self, hotel_id: int, hotel_in: HotelIn) -> Optional[Hotel]:
-        return self.repo.update(self.db, hotel_id, hotel_in)
+        previous_city = self._get_city(hotel_id)
+        hotel = self.repo.update(self.db, hotel_id, hotel_in)
+        if hotel:
+            search_cache.invalidate_hotel(hotel_id, previous_city, hotel.city)
+        return hotel
 
     def delete_hotel(self, hotel_id: int) -> bool:
-        return self.repo.delete(self.db, hotel_id)
+        city = self._get_city(hotel_id)
+        deleted = self.repo.delete(self.db, hotel_id)
+        if deleted:
+            search_cache.invalidate_hotel(hotel_id, city)
+        return deleted
 
     def get_all_hotels(self) -> List[HotelCard]:
         """
-        Retorna todos os hotéis cadastrados.
+        Retorna a primeira página (ordem por id) de hotéis. Para o catálogo completo, use export_catalog.
         """
         empty_filters = HotelFilter()
 
@@ -110,23 +181,65 @@ class HotelService:
         
         return hotels
 
+    @staticmethod
+    def export_catalog(fmt: str) -> Iterator[str]:
+        """
+        Gera o catálogo completo (HotelCard) em NDJSON ou CSV, lote a lote.
+        Usa sessão própria: o gerador é consumido depois que a requisição já retornou a resposta.
+        """
+        batch_size = HotelSettings.EXPORT_BATCH_SIZE
+        db = SessionLocal()
+        try:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=list(HotelCard.model_fields)) if fmt == "csv" else None
+            if writer:
+                writer.writeheader()
+
+            for count, row in enumerate(HotelRepository().stream_cards(db, batch_size), start=1):
+                card = HotelCard(**row)
+                if writer:
+                    writer.writerow(card.model_dump())
+                else:
+                    buffer.write(card.model_dump_json() + "\n")
+
+                if count % batch_size == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            db.close()
+
     def create_full(self, hotel_in: HotelIn) -> Hotel:
         """
         Cria hotel completo (com quartos, mídias e comodidades), delegando validação para o repository.
         """
-        return self.repo.create_full(self.db, hotel_in)
+        hotel = self.repo.create_full(self.db, hotel_in)
+        search_cache.invalidate_hotel(hotel.id, hotel.city)
+        return hotel
 
     # -------------------- ORCHESTRADORES --------------------
     def add_rooms(self, hotel_id: int, rooms_in: List[RoomIn]) -> Hotel:
-        return self.repo.add_rooms(self.db, hotel_id, rooms_in)
+        hotel = self.repo.add_rooms(self.db, hotel_id, rooms_in)
+        search_cache.invalidate_hotel(hotel.id, hotel.city)
+        return hotel
 
     def add_media(self, hotel_id: int, media_in: List[MediaIn]) -> Hotel:
-        return self.repo.add_media(self.db, hotel_id, media_in)
+        hotel = self.repo.add_media(self.db, hotel_id, media_in)
+        search_cache.invalidate_hotel(hotel.id, hotel.city)
+        return hotel
 
     def add_amenities(self, hotel_id: int, amenity_ids: List[int]) -> Hotel:
-        return self.repo.add_amenities(self.db, hotel_id, amenity_ids)
+        hotel = self.repo.add_amenities(self.db, hotel_id, amenity_ids)
+        search_cache.invalidate_hotel(hotel.id, hotel.city)
+        return hotel
 
     # -------------------- MÉTODOS PRIVADOS --------------------
+    def _get_city(self, hotel_id: int) -> Optional[str]:
+        return self.db.query(Hotel.city).filter(Hotel.id == hotel_id).scalar()
+
     def _calculate_distance(
         self,
         hotel: Hotel,
@@ -184,6 +297,24 @@ class HotelService:
                 "input": {"user_lat": filters.user_lat, "user_lng": filters.user_lng}
             })
 
+        # Relevância
+        if filters.sort == "relevance" and not (filters.q or filters.city or filters.neighborhood):
+            errors.append({
+                "loc": ["query", "sort"],
+                "msg": "For relevance sorting, at least one of q, city or neighborhood must be provided",
+                "type": "value_error",
+                "input": {"q": filters.q, "city": filters.city, "neighborhood": filters.neighborhood}
+            })
+
+        # Raio
+        if filters.radius_km is not None and (filters.user_lat is None or filters.user_lng is None):
+            errors.append({
+                "loc": ["query", "radius_km"],
+                "msg": "For radius filtering, user_lat and user_lng must be provided",
+                "type": "value_error",
+                "input": {"radius_km": filters.radius_km, "user_lat": filters.user_lat, "user_lng": filters.user_lng}
+            })
+
         if errors:
             raise HTTPException(status_code=422, detail=errors)
 
@@ -195,26 +326,18 @@ class HotelService:
         filters: HotelFilter,
         user_lat: Optional[float] = None,
         user_lng: Optional[float] = None
-    ) -> List[Hotel]:
+    ) -> Page[HotelCard]:
         """
-        Busca hotéis usando o repository e calcula distância e thumbnail.
+        Busca hotéis usando o repository (distância, preço e thumbnail já vêm calculados).
+        Retorna a página com meta (total e next_cursor para paginação por cursor).
         """
         # Valida consistência de negócio
         self.validate_filters(filters)
 
-        # Usa o search do repository
-        page_result = self.repo.search(self.db, filters)
-
-        hotels = [item for item in page_result.items]  # lista de Hotel ou HotelCard
-
-        # Calcula distância se coordenadas do usuário forem fornecidas
-        if user_lat is not None and user_lng is not None:
-            for h in hotels:
-                h.distance_km = self._calculate_distance(h, user_lat, user_lng)
-        else:
-            for h in hotels:
-                h.distance_km = None
-
-
-        return hotels
+        cache_key = search_cache.make_key(filters)
+        page = search_cache.get(cache_key)
+        if page is None:
+            page = self.repo.search(self.db, filters)
+            search_cache.set(cache_key, page, filters)
 
+        return page
@@ -0,0 +1,201 @@
+# idempotency.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database.database import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+from app.settings import IdempotencySettings
+
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str
+    status_code: Optional[int]  # None = requisição original em andamento
+    body: Any
+    expires_at: datetime
+
+
+class MemoryIdempotencyStore:
+    """
+    Respostas por chave em memória (LRU + TTL), válidas apenas dentro do processo.
+    """
+    def __init__(self, ttl_seconds: float, lock_seconds: float, max_entries: int):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lock = timedelta(seconds=lock_seconds)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, IdempotencyRecord]" = OrderedDict()
+        self._mutex = threading.Lock()
+
+    def begin(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """
+        Reserva a chave para esta requisição. Retorna o registro existente se a chave já estiver em uso.
+        """
+        now = datetime.utcnow()
+        with self._mutex:
+            record = self._entries.get(key)
+            if record and record.expires_at > now:
+                self._entries.move_to_end(key)
+                return record
+            self._entries[key] = IdempotencyRecord(fingerprint, None, None, now + self.lock)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return None
+
+    def complete(self, key: str, status_code: int, body: Any) -> None:
+        with self._mutex:
+            record = self._entries.get(key)
+            if record:
+                record.status_code = status_code
+                record.body = body
+                record.expires_at = datetime.utcnow() + self.ttl
+
+    def release(self, key: str) -> None:
+        with self._mutex:
+            self._entries.pop(key, None)
+
+
+class DatabaseIdempotencyStore:
+    """
+    Respostas por chave na tabela idempotency_keys, compartilhadas entre workers/instâncias.
+    Usa sessão própria para não se misturar à transação da requisição.
+    """
+    PURGE_EVERY = 1000  # a cada N chaves novas, remove as expiradas
+
+    def __init__(self, ttl_seconds: float, lock_seconds: float):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lock = timedelta(seconds=lock_seconds)
+        self._claims = 0
+
+    def begin(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        now = datetime.utcnow()
+        stmt = insert(IdempotencyKey).values(key=key, fingerprint=fingerprint, expires_at=now + self.lock)
+        # Chave expirada (ou em andamento com lock vencido) pode ser retomada
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "status_code": None,
+                "response_body": None,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at < now
+        ).returning(IdempotencyKey.key)
+
+        db = SessionLocal()
+        try:
+            while True:
+                claimed = db.execute(stmt).first()
+                if claimed:
+                    self._claims += 1
+                    if self._claims % self.PURGE_EVERY == 0:
+                        db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+                    db.commit()
+                    return None
+                db.commit()
+
+                row = db.query(
+                    IdempotencyKey.fingerprint, IdempotencyKey.status_code,
+                    IdempotencyKey.response_body, IdempotencyKey.expires_at
+                ).filter(IdempotencyKey.key == key).first()
+                if row:
+                    return IdempotencyRecord(row.fingerprint, row.status_code, row.response_body, row.expires_at)
+                # Chave liberada (release) ou purgada entre o claim e a leitura: tenta o claim de novo
+        finally:
+            db.close()
+
+    def complete(self, key: str, status_code: int, body: Any) -> None:
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(IdempotencyKey.key == key).update(
+                {
+                    "status_code": status_code,
+                    "response_body": body,
+                    "expires_at": datetime.utcnow() + self.ttl,
+                },
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, key: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(IdempotencyKey.key == key).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+def _build_store():
+    if IdempotencySettings.BACKEND == "database":
+        return DatabaseIdempotencyStore(IdempotencySettings.TTL_SECONDS, IdempotencySettings.LOCK_SECONDS)
+    return MemoryIdempotencyStore(
+        IdempotencySettings.TTL_SECONDS, IdempotencySettings.LOCK_SECONDS, IdempotencySettings.MAX_ENTRIES
+    )
+
+
+idempotency_store = _build_store()
+
+
+def run_idempotent(
+    idempotency_key: Optional[str],
+    scope: str,
+    payload: BaseModel,
+    action: Callable[[], Any],
+    status_code: int = 200,
+):
+    """
+    Executa `action` uma única vez por Idempotency-Key. Repetições com o mesmo corpo recebem
+    a resposta original (header Idempotent-Replayed) sem passar pelo fluxo de escrita.
+    Sem chave, apenas executa `action`. Erros liberam a chave para uma nova tentativa.
+    """
+    if not idempotency_key:
+        return action()
+
+    key = f"{scope}:{idempotency_key}"
+    fingerprint = hashlib.sha256(
+        json.dumps(payload.model_dump(mode="json"), sort_keys=True).encode()
+    ).hexdigest()
+
+    existing = idempotency_store.begin(key, fingerprint)
+    if existing:
+        if existing.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail=[{
+                    "loc": ["header", "Idempotency-Key"],
+                    "msg": "Idempotency-Key already used with a different request body",
+                    "type": "value_error",
+                    "input": idempotency_key
+                }]
+            )
+        if existing.status_code is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+        return JSONResponse(
+            status_code=existing.status_code,
+            content=existing.body,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    try:
+        body = jsonable_encoder(action())
+    except Exception:
+        idempotency_store.release(key)
+        raise
+
+    idempotency_store.complete(key, status_code, body)
+    return JSONResponse(status_code=status_code, content=body)
@@ -0,0 +1,122 @@
+# metrics_worker.py
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from app.database.database import SessionLocal
+from app.services.hotel_metrics_service import HotelMetricsService
+from app.settings import MetricsWorkerSettings
+
+logger = logging.getLogger("aluga-api")
+
+
+class MetricsWorker:
+    """
+    Fila em processo para o recálculo de stars/popularidade fora do caminho da requisição.
+    Pedidos para o mesmo hotel dentro da janela de debounce viram um único recálculo.
+    """
+    def __init__(self, debounce_seconds: float):
+        self.debounce_seconds = debounce_seconds
+        self._pending: Dict[int, float] = {}  # hotel_id -> instante do primeiro pedido pendente
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.scheduled = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.failures = 0
+
+    # -------------------- API --------------------
+    def schedule(self, hotel_id: int) -> None:
+        with self._cond:
+            self.scheduled += 1
+            if hotel_id in self._pending:
+                self.coalesced += 1
+                return
+            self._pending[hotel_id] = time.monotonic()
+            self._cond.notify()
+        # Garante o consumo mesmo fora da API (scripts, shell)
+        self.start()
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="metrics-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Para o worker processando o que ainda estiver pendente (sem esperar o debounce).
+        """
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify()
+        if thread:
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "scheduled": self.scheduled,
+                "coalesced": self.coalesced,
+                "processed": self.processed,
+                "failures": self.failures,
+            }
+
+    # -------------------- Loop --------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                due = self._wait_for_due()
+                if due is None:
+                    return
+            for hotel_id in due:
+                self._recalculate(hotel_id)
+
+    def _wait_for_due(self) -> Optional[list]:
+        """
+        Espera até haver hotéis com a janela vencida e os retira da fila. None = encerrar.
+        Deve ser chamado com o lock adquirido.
+        """
+        while True:
+            if self._stopping:
+                if not self._pending:
+                    return None
+                due = list(self._pending)
+                self._pending.clear()
+                return due
+
+            now = time.monotonic()
+            due = [h for h, since in self._pending.items() if now - since >= self.debounce_seconds]
+            if due:
+                for hotel_id in due:
+                    del self._pending[hotel_id]
+                return due
+
+            if self._pending:
+                oldest = min(self._pending.values())
+                self._cond.wait(self.debounce_seconds - (now - oldest))
+            else:
+                self._cond.wait()
+
+    def _recalculate(self, hotel_id: int) -> None:
+        db = SessionLocal()
+        try:
+            HotelMetricsService(db).calculate_and_update_metrics(hotel_id)
+            with self._cond:
+                self.processed += 1
+        except Exception as e:
+            db.rollback()
+            with self._cond:
+                self.failures += 1
+            logger.error(f"Falha ao recalcular métricas do hotel {hotel_id}: {e}")
+        finally:
+            db.close()
+
+
+metrics_worker = MetricsWorker(debounce_seconds=MetricsWorkerSettings.DEBOUNCE_SECONDS)
@@ -0,0 +1,86 @@
+# password_hasher.py
+import hmac
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.settings import PasswordSettings
+
+logger = logging.getLogger("aluga-api")
+
+
+class PasswordHasher:
+    """
+    Hash e verificação de senhas (bcrypt) num pool de threads limitado. O bcrypt libera a GIL
+    durante o cálculo, então o pool usa os núcleos sem travar o restante da API; acima de
+    max_workers + max_pending operações simultâneas o login responde 503 em vez de enfileirar
+    sem limite durante um pico de logins.
+    """
+    def __init__(self, rounds: int, max_workers: int, max_pending: int):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self._context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self.rejected = 0
+        self.upgraded = 0
+
+    def hash(self, password: str) -> str:
+        return self._submit(self._context.hash, password)
+
+    def verify_and_upgrade(self, password: str, stored: str) -> Tuple[bool, Optional[str]]:
+        """
+        Retorna (senha confere, novo hash). O novo hash vem preenchido quando o valor
+        armazenado é texto puro (legado) ou usa um custo diferente do configurado.
+        """
+        return self._submit(self._verify_and_upgrade, password, stored)
+
+    def is_hash(self, value: str) -> bool:
+        return self._context.identify(value, required=False) is not None
+
+    def stats(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "workers": self.max_workers,
+            "rejected": self.rejected,
+            "upgraded": self.upgraded,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _verify_and_upgrade(self, password: str, stored: str) -> Tuple[bool, Optional[str]]:
+        if not self.is_hash(stored):
+            # Senha legada em texto puro: compara em tempo constante e já devolve o hash
+            if not hmac.compare_digest(password.encode(), stored.encode()):
+                return False, None
+            self.upgraded += 1
+            return True, self._context.hash(password)
+        return self._context.verify_and_update(password, stored)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            logger.warning("password hasher saturado", extra={"sampled": True})
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Too many authentication requests, try again shortly",
+                                headers={"Retry-After": "1"})
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+
+password_hasher = PasswordHasher(
+    rounds=PasswordSettings.BCRYPT_ROUNDS,
+    max_workers=PasswordSettings.HASH_WORKERS or (os.cpu_count() or 1),
+    max_pending=PasswordSettings.HASH_MAX_PENDING,
+)
@@ -0,0 +1,96 @@
+# principal_cache.py
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from app.schemas.token import TokenData
+from app.settings import AuthSettings
+
+
+@dataclass
+class _Entry:
+    principal: TokenData
+    jti: Optional[str]
+    expires_at: float
+
+
+class PrincipalCache:
+    """
+    Cache LRU + TTL de token de acesso -> principal (id, role, userName), por processo.
+    A validade de cada entrada nunca passa do exp do próprio token. Alterações e remoções
+    de usuário em /users invalidam todos os tokens em cache daquele usuário. O jti fica junto
+    do principal para que acertos no cache ainda passem pela checagem de revogação.
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Tuple[TokenData, Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry.expires_at <= time.time():
+                if entry is not None:
+                    self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry.principal, entry.jti
+
+    def set(self, token: str, principal: TokenData, token_exp: Optional[float] = None,
+            jti: Optional[str] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = _Entry(principal, jti, expires_at)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+            self.invalidations += 1
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(entry.principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.principal.id]
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=AuthSettings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=AuthSettings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
@@ -6,11 +6,12 @@ from sqlalchemy import func
 from app.repositories.review_repository import ReviewRepository
 from app.repositories.hotel_repository import HotelRepository
 from app.repositories.user_repository import UserRepository
+from app.repositories.hotel_metrics_repository import HotelMetricsRepository
 from app.models.review import Review
 from app.models.hotel import Hotel
 from app.schemas.review import ReviewIn, ReviewUpdate, ReviewOut, ReviewUserOut
 from app.schemas.user import User
-from app.services.hotel_metrics_service import HotelMetricsService 
+from app.services.metrics_worker import metrics_worker
 
 
 class ReviewService:
@@ -19,7 +20,7 @@ class ReviewService:
         self.repo = ReviewRepository(db)
         self.hotel_repo = HotelRepository() 
         self.user_repo = UserRepository(db)
-        self.metrics_service = HotelMetricsService(db) 
+        self.metrics_repo = HotelMetricsRepository(db)
 
     def _enrich_review(self, review: Review) -> ReviewOut:
         user = self.user_repo.get_by_id(review.user_id)
@@ -49,9 +50,11 @@ class ReviewService:
             hotel_id=hotel_id, user_id=current_user.id,
             rating=review_in.rating, comment=review_in.comment
         )
+        # Agregados entram na mesma transação (o commit acontece no repositório)
+        self.metrics_repo.add_review(hotel_id, review_in.rating, 1)
         created_review = self.repo.create(db_review)
         
-        self.metrics_service.calculate_and_update_metrics(hotel_id)
+        metrics_worker.schedule(hotel_id)
         
         return self._enrich_review(created_review)
 
@@ -63,9 +66,13 @@ class ReviewService:
         if db_review.user_id != current_user.id and current_user.role != "sysAdmin":
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
             
+        rating_changed = review_update.rating is not None and review_update.rating != db_review.rating
+        if rating_changed:
+            self.metrics_repo.add_review(db_review.hotel_id, review_update.rating - db_review.rating, 0)
         updated_review = self.repo.update(db_review, review_update)
         
-        self.metrics_service.calculate_and_update_metrics(updated_review.hotel_id)
+        if rating_changed:
+            metrics_worker.schedule(updated_review.hotel_id)
         
         return self._enrich_review(updated_review)
 
@@ -78,9 +85,10 @@ class ReviewService:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
             
         hotel_id = db_review.hotel_id
+        self.metrics_repo.add_review(hotel_id, -db_review.rating, -1)
         self.repo.delete(db_review)
         
-        self.metrics_service.calculate_and_update_metrics(hotel_id)
+        metrics_worker.schedule(hotel_id)
 
     def get_all_reviews(self) -> List[ReviewOut]:
         raw_reviews = self.repo.get_all()
@@ -0,0 +1,159 @@
+# revocation_store.py
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database.database import SessionLocal
+from app.models.revoked_token import RevokedToken
+from app.settings import AuthSettings
+
+logger = logging.getLogger("aluga-api")
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom simples (k posições derivadas de um blake2b). Sem falsos negativos:
+    se might_contain é False, o jti com certeza não foi revogado.
+    """
+    HASHES = 4
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self._array = bytearray((bits + 7) // 8)
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, value: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=4 * self.HASHES).digest()
+        for i in range(self.HASHES):
+            yield int.from_bytes(digest[4 * i:4 * i + 4], "little") % self.bits
+
+
+class RevocationStore:
+    """
+    Revogação de tokens por jti. A consulta no caminho da requisição é só memória: o Bloom descarta
+    quase todos os tokens válidos e o dicionário confirma os suspeitos. A tabela revoked_tokens
+    propaga os logouts entre workers (sincronização periódica) e perde as linhas no exp do token.
+    """
+    def __init__(self, sync_seconds: float, bloom_bits: int):
+        self.sync_seconds = sync_seconds
+        self.bloom_bits = bloom_bits
+        self._revoked: Dict[str, datetime] = {}  # jti -> exp do token
+        self._bloom = BloomFilter(bloom_bits)
+        self._lock = threading.Lock()
+        self._last_sync: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------- Caminho da requisição --------------------
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti or not self._bloom.might_contain(jti):
+            return False
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    # -------------------- Escrita --------------------
+    def revoke(self, jti: Optional[str], expires_at: datetime) -> None:
+        """
+        Revoga o jti até expires_at (exp do token, UTC sem timezone). Tokens sem jti
+        (emitidos antes da revogação existir) expiram normalmente.
+        """
+        if not jti:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(
+                insert(RevokedToken)
+                .values(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            )
+            db.commit()
+        finally:
+            db.close()
+        self._add(jti, expires_at)
+
+    # -------------------- Sincronização --------------------
+    def sync(self) -> None:
+        """
+        Traz revogações de outros workers e remove o que já expirou (memória e tabela).
+        """
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > now)
+            if self._last_sync is not None:
+                # Sobreposição cobre relógios e transações que commitaram fora de ordem
+                query = query.filter(RevokedToken.revoked_at >= self._last_sync - timedelta(seconds=self.sync_seconds))
+            rows = query.all()
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            db.commit()
+        finally:
+            db.close()
+
+        for row in rows:
+            self._add(row.jti, row.expires_at)
+        self._last_sync = now
+        self._purge(now)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "last_sync": self._last_sync.isoformat() + "Z" if self._last_sync else None,
+        }
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Falha ao sincronizar tokens revogados: {e}")
+            if self._stop.wait(self.sync_seconds):
+                return
+
+    def _add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+            self._bloom.add(jti)
+
+    def _purge(self, now: datetime) -> None:
+        """
+        Remove jtis expirados e reconstrói o Bloom (bits não podem ser apagados individualmente).
+        """
+        with self._lock:
+            expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+            if not expired:
+                return
+            for jti in expired:
+                del self._revoked[jti]
+            bloom = BloomFilter(self.bloom_bits)
+            for jti in self._revoked:
+                bloom.add(jti)
+            self._bloom = bloom
+
+
+revocation_store = RevocationStore(
+    sync_seconds=AuthSettings.REVOCATION_SYNC_SECONDS,
+    bloom_bits=AuthSettings.REVOCATION_BLOOM_BITS,
+)
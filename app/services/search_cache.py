@@ -0,0 +1,126 @@
+# search_cache.py
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.schemas.hotel import HotelCard
+from app.schemas.hotel_filter import HotelFilter
+from app.schemas.pagination import Page
+from app.settings import SearchCacheSettings
+
+
+def _fold(text: str) -> str:
+    """
+    Aproxima em Python a normalização da busca textual (lower + sem acentos).
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+@dataclass
+class _Entry:
+    page: Page[HotelCard]
+    expires_at: float
+    city: Optional[str]      # termo de cidade do filtro (normalizado), None = qualquer cidade
+    hotel_ids: frozenset
+
+
+class SearchCache:
+    """
+    Cache LRU + TTL de páginas de search, por processo. Chave = forma canônica do HotelFilter.
+    Escritas em hotéis/quartos/mídias/amenities/reservas invalidam as entradas afetadas.
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(filters: HotelFilter) -> str:
+        data = filters.model_dump(mode="json")
+        # A busca textual ignora maiúsculas; a ordem das amenities não altera o resultado
+        for field in ("q", "city", "neighborhood"):
+            if data[field]:
+                data[field] = data[field].lower()
+        if data["amenities"]:
+            data["amenities"] = sorted(set(data["amenities"]))
+        return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+    def get(self, key: str) -> Optional[Page[HotelCard]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.page
+
+    def set(self, key: str, page: Page[HotelCard], filters: HotelFilter) -> None:
+        if self.max_entries <= 0:
+            return
+        entry = _Entry(
+            page=page,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            city=_fold(filters.city) if filters.city else None,
+            hotel_ids=frozenset(item.id for item in page.items),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_hotel(self, hotel_id: int, *cities: Optional[str]) -> None:
+        """
+        Remove entradas que contêm o hotel ou cujo filtro de cidade pode incluí-lo
+        (inclusive buscas sem cidade). Informe a cidade antiga e a nova quando ela mudar.
+        """
+        folded_cities = [_fold(city) for city in cities if city]
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if hotel_id in entry.hotel_ids
+                or entry.city is None
+                or any(entry.city in city for city in folded_cities)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+search_cache = SearchCache(
+    ttl_seconds=SearchCacheSettings.TTL_SECONDS,
+    max_entries=SearchCacheSettings.MAX_ENTRIES,
+)
@@ -1,6 +1,13 @@
+import csv
+import io
+from typing import Iterator, Tuple
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from ..schemas.user import User
+from app.database.database import SessionLocal
+from app.settings import UserSettings
+from ..schemas.user import User, UserOut
+from ..schemas.user_filter import UserFilter
+from ..schemas.pagination import Page, PageMeta, encode_cursor, decode_cursor
 from ..repositories.user_repository import UserRepository
 
 class UserDatabaseService:
@@ -25,11 +32,82 @@ class UserDatabaseService:
       return True
     raise HTTPException(status_code=422, detail="User already exists")
   
-  def get_all_users(self):
-    userList = self.repo.get_all_users()
-    if not userList:
-      raise HTTPException(status_code=404, detail="User not found")
-    return userList
+  def list_users(self, filters: UserFilter) -> Page[UserOut]:
+    """
+    Listagem administrativa paginada por cursor (keyset em userName, id).
+    As linhas vêm do banco já válidas: UserOut.model_construct não reexecuta os validadores de entrada.
+    """
+    after = self._decode_cursor(filters) if filters.cursor else None
+    total = self.repo.count(filters.role, filters.name_prefix)
+
+    # Busca um registro a mais para saber se existe próxima página
+    rows = self.repo.list_page(filters.role, filters.name_prefix, after, filters.size + 1)
+    has_next = len(rows) > filters.size
+    rows = rows[:filters.size]
+
+    next_cursor = None
+    if has_next:
+      last = rows[-1]
+      next_cursor = encode_cursor({
+        "filters": [filters.role, filters.name_prefix],
+        "keys": [last["userName"], last["id"]]
+      })
+
+    return Page[UserOut](
+      meta=PageMeta(page=1, size=filters.size, total=total, next_cursor=next_cursor),
+      items=[UserOut.model_construct(**row) for row in rows]
+    )
+
+  @staticmethod
+  def export_users(filters: UserFilter, fmt: str) -> Iterator[str]:
+    """
+    Gera todos os usuários filtrados (UserOut) em NDJSON ou CSV, lote a lote, sem validação por linha.
+    Usa sessão própria: o gerador é consumido depois que a requisição já retornou a resposta.
+    """
+    batch_size = UserSettings.EXPORT_BATCH_SIZE
+    db = SessionLocal()
+    try:
+      buffer = io.StringIO()
+      writer = csv.DictWriter(buffer, fieldnames=list(UserOut.model_fields)) if fmt == "csv" else None
+      if writer:
+        writer.writeheader()
+
+      rows = UserRepository(db).stream(filters.role, filters.name_prefix, batch_size)
+      for count, row in enumerate(rows, start=1):
+        user = UserOut.model_construct(**row)
+        if writer:
+          writer.writerow(user.model_dump())
+        else:
+          buffer.write(user.model_dump_json() + "\n")
+
+        if count % batch_size == 0:
+          yield buffer.getvalue()
+          buffer.seek(0)
+          buffer.truncate()
+
+      if buffer.tell():
+        yield buffer.getvalue()
+    finally:
+      db.close()
+
+  @staticmethod
+  def _decode_cursor(filters: UserFilter) -> Tuple[str, str]:
+    try:
+      payload = decode_cursor(filters.cursor)
+      if payload.get("filters") != [filters.role, filters.name_prefix]:
+        raise ValueError("cursor does not match the requested filters")
+      user_name, user_id = payload["keys"]
+      return str(user_name), str(user_id)
+    except (ValueError, TypeError, KeyError, AttributeError):
+      raise HTTPException(
+        status_code=422,
+        detail=[{
+          "loc": ["query", "cursor"],
+          "msg": "Invalid cursor for this listing. Start again without cursor.",
+          "type": "value_error.cursor",
+          "input": filters.cursor
+        }]
+      )
   
 class UserBusinessRulesService:
   
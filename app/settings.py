@@ -1,5 +1,50 @@
+
 # app/settings.py
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
 
 class HotelSettings:
     PROXIMITY_RADIUS_METERS: float = 11  # distância mínima entre hotéis
+    EXPORT_BATCH_SIZE: int = 500  # linhas por lote no export do catálogo
+    AVAILABILITY_MAX_NIGHTS: int = 90  # noites por consulta na matriz de disponibilidade
+    POPULARITY_WINDOW_DAYS: int = 30  # reservas mais antigas que isso não contam na popularidade
+
+class SearchCacheSettings:
+    TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "60"))  # validade de uma página em cache
+    MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024"))  # 0 desliga o cache
+
+class MetricsWorkerSettings:
+    DEBOUNCE_SECONDS: float = float(os.getenv("METRICS_DEBOUNCE_SECONDS", "2"))  # janela para agrupar recálculos do mesmo hotel
+
+class IdempotencySettings:
+    BACKEND: str = os.getenv("IDEMPOTENCY_BACKEND", "memory")  # memory (por processo) ou database (vários workers)
+    TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))  # por quanto tempo a resposta é reaproveitada
+    LOCK_SECONDS: float = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))  # após isso, uma chave em andamento pode ser retomada
+    MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))  # limite do backend memory
+
+class BookingHoldSettings:
+    TTL_SECONDS: int = int(os.getenv("BOOKING_HOLD_TTL_SECONDS", "600"))  # duração de um hold de checkout
+    SWEEP_INTERVAL_SECONDS: float = float(os.getenv("BOOKING_HOLD_SWEEP_INTERVAL_SECONDS", "30"))  # intervalo do sweeper
+    SWEEP_BATCH_SIZE: int = int(os.getenv("BOOKING_HOLD_SWEEP_BATCH_SIZE", "500"))  # holds liberados por transação
+
+class AuthSettings:
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))  # validade do principal em cache
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))  # 0 desliga o cache
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))  # atraso máximo de um logout em outros workers
+    REVOCATION_BLOOM_BITS: int = int(os.getenv("REVOCATION_BLOOM_BITS", str(1 << 20)))  # 128 KiB; ~1% de falso positivo com ~100 mil jtis
+
+class UserSettings:
+    EXPORT_BATCH_SIZE: int = 1000  # linhas por lote no export de usuários
+
+class PasswordSettings:
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # custo do bcrypt (2^rounds iterações)
+    HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))  # 0 = número de CPUs
+    # Fila curta: cada login na fila ocupa uma das 40 threads do threadpool das rotas síncronas
+    HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "8"))  # além disso o login responde 503
 
+class LoggingSettings:
+    LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))  # fração mantida dos eventos de alto volume (access log)
+    QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # acima disso, registros são descartados em vez de bloquear
@@ -0,0 +1,38 @@
+"""
+Custo da autenticação por requisição: faz login uma vez e dispara --requests chamadas
+autenticadas (header access_token) a --path com --concurrency simultâneas.
+
+Antes/depois do principal_cache: rode a API duas vezes e compare os relatórios.
+
+    PRINCIPAL_CACHE_MAX_ENTRIES=0 fastapi run app/main.py   # antes: JWT + consulta ao banco por requisição
+    fastapi run app/main.py                                 # depois: acerto no cache
+
+    python -m benchmarks.bench_auth --user maria --password 'Senha@123' --requests 2000 --concurrency 32
+"""
+import asyncio
+
+import httpx
+
+from benchmarks.common import base_parser, login, print_report, run_load
+
+
+async def main(args) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        token = await login(client, args.user, args.password)
+        headers = {"access_token": token}
+        # Aquecimento: popula o cache (quando ligado) e o pool de conexões
+        await run_load(args.concurrency, args.concurrency, lambda _: client.get(args.path, headers=headers))
+        report = await run_load(args.requests, args.concurrency, lambda _: client.get(args.path, headers=headers))
+
+    print_report(f"GET {args.path} autenticado", report)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=10) as client:
+        details = (await client.get("/health")).json().get("details", {})
+    print_report("principal_cache (/health)", details.get("principal_cache", {}))
+
+
+if __name__ == "__main__":
+    parser = base_parser("Latência e vazão de rotas autenticadas (antes/depois do principal_cache)")
+    parser.add_argument("--user", required=True, help="userName de um usuário existente")
+    parser.add_argument("--password", required=True, help="senha desse usuário")
+    parser.add_argument("--path", default="/users/me", help="rota autenticada a medir")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""
+Disputa pelo mesmo quarto: dispara --requests POST /bookings/ simultâneas (--concurrency em voo)
+para o mesmo quarto e período, uma unidade cada. Com o upsert condicional em room_nights, no
+máximo total_units reservas devem ser aceitas e as demais devem voltar 409, sem overbooking.
+
+Use uma base descartável: as reservas criadas são removidas ao final (--keep para mantê-las).
+
+    python -m benchmarks.bench_bookings --user maria --password 'Senha@123' \\
+        --hotel-id 1 --room-id 3 --total-units 5 --check-in 2027-03-10 --nights 3 --requests 200
+"""
+import asyncio
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.common import base_parser, login, print_report, run_load
+
+
+async def main(args) -> None:
+    check_in = date.fromisoformat(args.check_in)
+    payload = {
+        "hotel_id": args.hotel_id,
+        "room_id": args.room_id,
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(days=args.nights)).isoformat(),
+        "rooms_booked": 1,
+    }
+    created = []
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        headers = {"access_token": await login(client, args.user, args.password)}
+
+        async def book(_):
+            response = await client.post("/bookings/", json=payload, headers=headers)
+            if response.status_code == 200:
+                created.append(response.json()["id"])
+            return response
+
+        report = await run_load(args.requests, args.concurrency, book)
+
+        if not args.keep:
+            for booking_id in created:
+                await client.delete(f"/bookings/{booking_id}", headers=headers)
+
+    report["accepted"] = len(created)
+    report["conflicts_409"] = report["statuses"].get(409, 0)
+    if args.total_units is not None:
+        report["overbooked"] = len(created) > args.total_units
+    print_report(f"POST /bookings/ no quarto {args.room_id}", report)
+
+
+if __name__ == "__main__":
+    parser = base_parser("Reservas concorrentes no mesmo quarto: vazão, 409s e overbooking")
+    parser.add_argument("--user", required=True, help="userName de um usuário existente")
+    parser.add_argument("--password", required=True, help="senha desse usuário")
+    parser.add_argument("--hotel-id", type=int, required=True)
+    parser.add_argument("--room-id", type=int, required=True)
+    parser.add_argument("--total-units", type=int, default=None, help="total_units do quarto, para checar overbooking")
+    parser.add_argument("--check-in", required=True, help="data de check-in (AAAA-MM-DD), sem reservas prévias")
+    parser.add_argument("--nights", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="não remove as reservas criadas")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,51 @@
+"""
+A dependência de autenticação bloqueia o event loop? Para cada nível de --levels, dispara
+--requests chamadas autenticadas a --path com aquele número de requisições simultâneas e, em
+paralelo, sonda GET /openapi.json (rota async, sem banco). Se get_current_user rodasse JWT e
+consulta no loop, a latência da sonda cresceria com a concorrência; com o acerto no cache e o
+run_in_threadpool ela deve ficar próxima da medida em repouso.
+
+Rode com o cache ligado (caminho do acerto) e com PRINCIPAL_CACHE_MAX_ENTRIES=0 (toda
+requisição vai ao threadpool):
+
+    python -m benchmarks.bench_event_loop --user maria --password 'Senha@123' --levels 1,8,32,128
+"""
+import asyncio
+
+import httpx
+
+from benchmarks.common import base_parser, login, print_report, probe, run_load, summarize
+
+PROBE_PATH = "/openapi.json"
+
+
+async def main(args) -> None:
+    levels = [int(level) for level in args.levels.split(",")]
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60,
+                                 limits=httpx.Limits(max_connections=max(levels) + 1)) as client:
+        headers = {"access_token": await login(client, args.user, args.password)}
+
+        stop = asyncio.Event()
+        idle = asyncio.create_task(probe(client, PROBE_PATH, args.probe_interval, stop))
+        await asyncio.sleep(args.idle_seconds)
+        stop.set()
+        print_report("Sonda em repouso (ms)", summarize(await idle))
+
+        for level in levels:
+            stop = asyncio.Event()
+            busy = asyncio.create_task(probe(client, PROBE_PATH, args.probe_interval, stop))
+            report = await run_load(args.requests, level, lambda _: client.get(args.path, headers=headers))
+            stop.set()
+            report["probe_ms"] = summarize(await busy)
+            print_report(f"Concorrência {level}", report)
+
+
+if __name__ == "__main__":
+    parser = base_parser("Latência do event loop sob carga de rotas autenticadas", concurrency=False)
+    parser.add_argument("--user", required=True, help="userName de um usuário existente")
+    parser.add_argument("--password", required=True, help="senha desse usuário")
+    parser.add_argument("--path", default="/users/me", help="rota autenticada a medir")
+    parser.add_argument("--levels", default="1,8,32,128", help="níveis de concorrência, separados por vírgula")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="intervalo entre sondas (s)")
+    parser.add_argument("--idle-seconds", type=float, default=3.0, help="duração da medição em repouso (s)")
+    asyncio.run(main(parser.parse_args()))
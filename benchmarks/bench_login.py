@@ -0,0 +1,47 @@
+"""
+Pico de logins: dispara --requests logins com --concurrency simultâneos e, em paralelo, sonda
+--probe-path. Com o bcrypt no pool do password_hasher, a latência da sonda durante o pico deve
+ficar próxima da medida em repouso; logins além da capacidade do pool voltam 503 (Retry-After)
+em vez de enfileirar. Sonde também uma rota síncrona (ex.: /health), que divide o threadpool
+com o login.
+
+    python -m benchmarks.bench_login --user admin --password 'Senha@123' --requests 500 --concurrency 64
+    python -m benchmarks.bench_login --user admin --password 'Senha@123' --probe-path /health
+"""
+import asyncio
+
+import httpx
+
+from benchmarks.common import base_parser, print_report, probe, run_load, summarize
+
+
+async def main(args) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        # Latência da sonda em repouso
+        stop = asyncio.Event()
+        idle = asyncio.create_task(probe(client, args.probe_path, args.probe_interval, stop))
+        await asyncio.sleep(args.idle_seconds)
+        stop.set()
+        idle_latencies = await idle
+
+        # Mesma sonda durante o pico de logins
+        stop = asyncio.Event()
+        busy = asyncio.create_task(probe(client, args.probe_path, args.probe_interval, stop))
+        payload = {"userName": args.user, "password": args.password}
+        report = await run_load(args.requests, args.concurrency, lambda _: client.post("/login", json=payload))
+        stop.set()
+        busy_latencies = await busy
+
+    print_report("Logins", report)
+    print_report("Sonda em repouso (ms)", summarize(idle_latencies))
+    print_report("Sonda durante o pico (ms)", summarize(busy_latencies))
+
+
+if __name__ == "__main__":
+    parser = base_parser("Vazão de login e responsividade da API durante um pico de logins")
+    parser.add_argument("--user", required=True, help="userName de um usuário existente")
+    parser.add_argument("--password", required=True, help="senha desse usuário")
+    parser.add_argument("--probe-path", default="/openapi.json", help="rota sondada (padrão: async, sem banco)")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="intervalo entre sondas (s)")
+    parser.add_argument("--idle-seconds", type=float, default=3.0, help="duração da medição em repouso (s)")
+    asyncio.run(main(parser.parse_args()))
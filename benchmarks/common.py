@@ -0,0 +1,97 @@
+"""
+Utilitários dos benchmarks HTTP: rodam contra uma API já no ar (fastapi run app/main.py)
+com banco populado; nada aqui importa o app.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import Awaitable, Callable, List
+
+import httpx
+
+
+def base_parser(description: str, concurrency: bool = True) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="URL da API em execução")
+    parser.add_argument("--requests", type=int, default=500, help="total de requisições da carga")
+    if concurrency:
+        parser.add_argument("--concurrency", type=int, default=32, help="requisições simultâneas")
+    return parser
+
+
+async def login(client: httpx.AsyncClient, user_name: str, password: str) -> str:
+    response = await client.post("/login", json={"userName": user_name, "password": password})
+    response.raise_for_status()
+    return response.json()["token_content"]["access_token"]
+
+
+async def run_load(total: int, concurrency: int, send: Callable[[int], Awaitable[httpx.Response]]) -> dict:
+    """
+    Dispara total chamadas de send(i) com no máximo concurrency em voo.
+    Retorna vazão, contagem por status e latências (ms).
+    """
+    statuses: Counter = Counter()
+    latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1) if elapsed else None,
+        "statuses": dict(statuses),
+        "latency_ms": summarize(latencies),
+    }
+
+
+async def probe(client: httpx.AsyncClient, path: str, interval: float, stop: asyncio.Event) -> List[float]:
+    """
+    Mede a latência de path a cada interval segundos até stop: sinal de que a API segue respondendo.
+    """
+    latencies: List[float] = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+    return latencies
+
+
+def summarize(latencies: List[float]) -> dict:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "p50": round(statistics.median(ordered), 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def print_report(title: str, report: dict) -> None:
+    print(title)
+    for key, value in report.items():
+        print(f"  {key}: {value}")
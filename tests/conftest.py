@@ -0,0 +1,54 @@
+import os
+
+# app.database e auth_service leem estas variáveis na importação; o engine só conecta no primeiro uso
+for key, value in {
+    "USER_DB": "test",
+    "USER_PASSWORD": "test",
+    "HOST_DB": "localhost",
+    "PORT_DB": "5432",
+    "DB_NAME": "test",
+    "SSL_MODE": "disable",
+    "ACCESS_TOKEN_SECRET": "test-access-secret",
+    "REFRESH_TOKEN_SECRET": "test-refresh-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "REFRESH_TOKEN_EXPIRE_MINUTES": "1440",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable, DropTable
+
+from app.models import Booking, Hotel, HotelBookingDay, Room, RoomNight, User
+
+# Tabelas do fluxo de reservas, sem os índices de busca (que exigem cube, earthdistance e pg_trgm)
+BOOKING_TABLES = [User.__table__, Hotel.__table__, Room.__table__, Booking.__table__,
+                  RoomNight.__table__, HotelBookingDay.__table__]
+
+
+@pytest.fixture
+def pg_session():
+    """
+    Sessão num Postgres descartável apontado por TEST_DATABASE_URL; o teste é pulado sem ele.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL não configurada")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for table in reversed(BOOKING_TABLES):
+            conn.execute(DropTable(table, if_exists=True))
+        for table in BOOKING_TABLES:
+            conn.execute(CreateTable(table))
+    session = Session(bind=engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(BOOKING_TABLES):
+                conn.execute(DropTable(table, if_exists=True))
+        engine.dispose()
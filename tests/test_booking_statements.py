@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.models import Hotel, Room, User
+from app.schemas.booking import BookingCreate, BookingUpdate
+from app.schemas.token import TokenData
+from app.services.booking_service import BookingService
+
+
+@contextmanager
+def count_statements(session):
+    statements = []
+    engine = session.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def seeded(pg_session):
+    # Inserts em Core: o ORM carregaria os relacionamentos selectin de Hotel (amenities, media...)
+    pg_session.execute(insert(User).values(
+        id="u-1", userName="maria", password="x", role="customer", birthDate=datetime(1990, 1, 1),
+        emailAddress="maria@example.com", phoneNumber="11988888888", firstName="", lastName="", address=""
+    ))
+    hotel_id = pg_session.execute(
+        insert(Hotel).values(name="Hotel Praia", city="Recife", latitude=-8.1, longitude=-34.9,
+                             stars=4.0, popularity=0.0, rating_sum=0.0, review_count=0)
+        .returning(Hotel.id)
+    ).scalar_one()
+    room_id = pg_session.execute(
+        insert(Room).values(hotel_id=hotel_id, name="Duplo", room_type="double", capacity=2,
+                            base_price=200.0, total_units=2)
+        .returning(Room.id)
+    ).scalar_one()
+    pg_session.commit()
+    return {"user": TokenData(id="u-1", role="customer", userName="maria"), "hotel_id": hotel_id, "room_id": room_id}
+
+
+def test_create_booking_round_trips(pg_session, seeded):
+    data = BookingCreate(hotel_id=seeded["hotel_id"], room_id=seeded["room_id"],
+                         check_in=date(2030, 1, 10), check_out=date(2030, 1, 13))
+
+    with count_statements(pg_session) as statements:
+        details = BookingService(pg_session).create_booking(data, seeded["user"])
+
+    # quarto+hotel (projeção), upsert de room_nights, INSERT da reserva, contador diário do hotel
+    assert len(statements) == 4, statements
+    assert details.hotel.name == "Hotel Praia"
+
+
+def test_update_booking_round_trips(pg_session, seeded):
+    data = BookingCreate(hotel_id=seeded["hotel_id"], room_id=seeded["room_id"],
+                         check_in=date(2030, 1, 10), check_out=date(2030, 1, 13))
+    booking_id = BookingService(pg_session).create_booking(data, seeded["user"]).id
+
+    with count_statements(pg_session) as statements:
+        details = BookingService(pg_session).update_booking(
+            booking_id, BookingUpdate(check_out=date(2030, 1, 14)), seeded["user"]
+        )
+
+    # reserva, quarto+hotel (projeção), devolução e nova ocupação de room_nights, UPDATE da reserva
+    assert len(statements) == 5, statements
+    assert details.check_out == date(2030, 1, 14)
@@ -0,0 +1,17 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import hotels
+
+HOTEL = {"name": "Hotel Praia", "city": "Recife", "latitude": -8.1, "longitude": -34.9}
+
+
+def test_idempotency_key_requires_authentication():
+    app = FastAPI()
+    app.include_router(hotels.router)
+
+    # Sem principal não há escopo próprio para a chave: 401 antes de tocar o banco ou o store
+    response = TestClient(app).post("/hotels/full", json=HOTEL, headers={"Idempotency-Key": "k-1"})
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
@@ -0,0 +1,57 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.user import User
+from app.services.password_hasher import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    # Custo mínimo do bcrypt: os testes verificam o fluxo, não o tempo de hash
+    hasher = PasswordHasher(rounds=4, max_workers=2, max_pending=2)
+    yield hasher
+    hasher.shutdown()
+
+
+def user_payload(password: str) -> dict:
+    return {
+        "userName": "maria",
+        "password": password,
+        "birthDate": "1990-01-01T00:00:00",
+        "emailAddress": "maria@example.com",
+        "phoneNumber": "11988888888",
+    }
+
+
+def test_hash_and_verify(hasher):
+    stored = hasher.hash("Senha@123")
+    assert hasher.is_hash(stored)
+    assert hasher.verify_and_upgrade("Senha@123", stored) == (True, None)
+    assert hasher.verify_and_upgrade("Outra@123", stored) == (False, None)
+
+
+def test_legacy_plaintext_is_upgraded(hasher):
+    valid, new_hash = hasher.verify_and_upgrade("Senha@123", "Senha@123")
+    assert valid
+    assert hasher.is_hash(new_hash)
+    assert hasher.verify_and_upgrade("Senha@123", new_hash) == (True, None)
+    assert hasher.verify_and_upgrade("Errada@123", "Senha@123") == (False, None)
+
+
+def test_outdated_cost_is_upgraded(hasher):
+    weaker = PasswordHasher(rounds=5, max_workers=1, max_pending=0)
+    try:
+        stored = weaker.hash("Senha@123")
+    finally:
+        weaker.shutdown()
+    valid, new_hash = hasher.verify_and_upgrade("Senha@123", stored)
+    assert valid
+    assert new_hash.startswith("$2b$04$")
+
+
+def test_client_cannot_send_hash_as_password():
+    # Hash fixo com "." e "/": hashes sem esses caracteres também satisfazem a política de senha
+    stored = "$2b$04$UIX896waCjLWs/mCvhBPO.vQg2rzvdQnhgML/aUxQG8qQXdOMV5TC"
+    with pytest.raises(ValidationError):
+        User.model_validate(user_payload(stored))
+    assert User.model_validate(user_payload(stored), context={"stored_password": True}).password == stored